@@ -0,0 +1,255 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.workbooks import ensure_workbook, parse_size
+from logic.options import MODES
+from logic.pipeline import export_summary
+from logic.sheet_cache import read_used_columns
+from logic.summarizer import IMPORTER_COL, WEIGHT_COL, read_and_summarize, round_summary, summarize_metrics
+from logic.utils import format_sheet
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SHEET_NAME = "TH_2023"
+TIME_THRESHOLD = 0.15    # slower by more than 15% is a regression
+MEMORY_THRESHOLD = 0.15  # higher peak by more than 15% is a regression
+
+
+def measure(func, setup=None, repeat=3):
+    # Peak memory from one traced run (tracing slows code down, so it is not timed),
+    # then the best and median wall time of untraced runs
+    state = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    func(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+    return {"seconds": min(times), "median_seconds": statistics.median(times), "peak_mb": peak / 2**20}
+
+
+def bench_read(path, repeat):
+    return measure(lambda _: read_used_columns(path, SHEET_NAME), repeat=repeat)
+
+
+def bench_read_and_summarize(path, repeat):
+    df = read_used_columns(path, SHEET_NAME)
+    return measure(lambda _: read_and_summarize(df, IMPORTER_COL, WEIGHT_COL), repeat=repeat)
+
+
+def bench_format_sheet(path, repeat, work_dir):
+    # The original export step: a plain to_excel sheet restyled in place by format_sheet
+    df = read_used_columns(path, SHEET_NAME)
+    summary = round_summary(summarize_metrics(df, IMPORTER_COL, [WEIGHT_COL])[WEIGHT_COL])
+    output = os.path.join(work_dir, "format_sheet.xlsx")
+
+    def setup():
+        summary.to_excel(output, sheet_name="importer_weight")
+        return output
+
+    return measure(lambda out: format_sheet(out, "importer_weight", "Importer", "Weight"), setup, repeat)
+
+
+def bench_export(path, repeat, work_dir, streaming=False):
+    # Everything Run Summary does without previews: read, summarize both modes, write
+    output = os.path.join(work_dir, "export.xlsx")
+    return measure(lambda _: export_summary(path, output, SHEET_NAME, MODES, streaming=streaming), repeat=repeat)
+
+
+def preview_root():
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except Exception:  # no display
+        return None
+    root.withdraw()
+    return root
+
+
+def bench_preview(path, repeat, root, combines=100):
+    from gui.preview_window import PreviewWindow
+
+    df = read_used_columns(path, SHEET_NAME)
+    summary = summarize_metrics(df, IMPORTER_COL, [WEIGHT_COL])[WEIGHT_COL]
+
+    def populate(_):
+        window = PreviewWindow(root, "Importer - Weight", summary, lambda *args: None)
+        root.update()
+        window.destroy()
+
+    def setup():
+        window = PreviewWindow(root, "Importer - Weight", summary, lambda *args: None)
+        root.update()
+        return window
+
+    def combine(window):
+        # Repeatedly fold the smallest-index row into the next one, as a user cleaning up would
+        for _ in range(min(combines, len(window.names) - 1)):
+            window.source_names, window.target_name = [window.names[0]], window.names[1]
+            window.combine_rows()
+        root.update()
+        window.destroy()
+
+    def bulk_combine(window):
+        # The same number of rows folded into the last one as a single multi-select combine
+        count = min(combines, len(window.names) - 1)
+        window.source_names, window.target_name = window.names[:count], window.names[-1]
+        window.combine_rows()
+        root.update()
+        window.destroy()
+
+    return {
+        "preview_populate": measure(populate, repeat=repeat),
+        "preview_combine": measure(combine, setup, repeat),
+        "preview_bulk_combine": measure(bulk_combine, setup, repeat),
+    }
+
+
+def run_benchmarks(sizes, names, repeat, include_streaming=False):
+    results = {}
+    root = preview_root()
+    work_dir = tempfile.mkdtemp(prefix="monthly_summary_bench_")
+    try:
+        for size in sizes:
+            rows = parse_size(size)
+            print(f"== {size} rows, {names} names", flush=True)
+            path = ensure_workbook(rows, names)
+            cases = {
+                "read_used_columns": lambda: bench_read(path, repeat),
+                "read_and_summarize": lambda: bench_read_and_summarize(path, repeat),
+                "format_sheet": lambda: bench_format_sheet(path, repeat, work_dir),
+                "export_summary": lambda: bench_export(path, repeat, work_dir),
+            }
+            if include_streaming:
+                cases["export_summary_streaming"] = lambda: bench_export(path, repeat, work_dir, streaming=True)
+
+            size_results = {}
+            for case, run in cases.items():
+                size_results[case] = run()
+                print(format_result(case, size_results[case]), flush=True)
+            if root is not None:
+                for case, result in bench_preview(path, repeat, root).items():
+                    size_results[case] = result
+                    print(format_result(case, result), flush=True)
+            else:
+                print("  preview benchmarks skipped (no display)")
+            results[size] = size_results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if root is not None:
+            root.destroy()
+    return results
+
+
+def format_result(case, result):
+    return f"  {case:<26} {result['seconds']:9.3f}s  (median {result['median_seconds']:.3f}s)  peak {result['peak_mb']:8.1f} MB"
+
+
+def current_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def save_results(results, names, repeat):
+    commit = current_commit()
+    record = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "names": names,
+        "repeat": repeat,
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load_results(ref):
+    # A results file, or a commit id (prefix) saved under benchmarks/results
+    if os.path.exists(ref):
+        path = ref
+    else:
+        matches = sorted(f for f in os.listdir(RESULTS_DIR) if f.startswith(ref) and f.endswith(".json"))
+        if not matches:
+            raise FileNotFoundError(f"No saved benchmark results for '{ref}'")
+        path = os.path.join(RESULTS_DIR, matches[0])
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, results, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    # Print the change per case and return the regressions beyond the thresholds
+    regressions = []
+    print(f"\nCompared with {baseline['commit']} (thresholds: time +{time_threshold:.0%}, memory +{memory_threshold:.0%})")
+    for size, cases in results.items():
+        for case, result in cases.items():
+            before = baseline["results"].get(size, {}).get(case)
+            if before is None:
+                continue
+            time_ratio = result["seconds"] / before["seconds"] if before["seconds"] else 1.0
+            memory_ratio = result["peak_mb"] / before["peak_mb"] if before["peak_mb"] else 1.0
+            flags = []
+            if time_ratio > 1 + time_threshold:
+                flags.append("SLOWER")
+            if memory_ratio > 1 + memory_threshold:
+                flags.append("MORE MEMORY")
+            if flags:
+                regressions.append((size, case, flags))
+            print(f"  {size:>5} {case:<26} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {' '.join(flags)}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark summarizing, formatting, export and preview.")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k"], help="Workbook sizes: 10k, 100k, 1m or row counts (default: 10k 100k).")
+    parser.add_argument("--names", type=int, default=5000, help="Distinct importer names per workbook (default: 5000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept (default: 3).")
+    parser.add_argument("--streaming", action="store_true", help="Also benchmark the streaming export.")
+    parser.add_argument("--save", action="store_true", help="Save results as benchmarks/results/<commit>.json.")
+    parser.add_argument("--compare", metavar="REF", help="Compare with saved results (commit id or file); exit 1 on regression.")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.compare) if args.compare else None
+    results = run_benchmarks(args.sizes, args.names, args.repeat, args.streaming)
+    if args.save:
+        print(f"\nSaved {save_results(results, args.names, args.repeat)}")
+    if baseline is not None:
+        regressions = compare(baseline, results, args.time_threshold, args.memory_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond the thresholds")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+
+from openpyxl import Workbook
+
+from logic.summarizer import DATE_COL, EXPORTER_COL, IMPORTER_COL, QUANTITY_COL, WEIGHT_COL
+from logic.paths import app_data_path, extract_sheet_name_from_filename
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+LAST_COL = WEIGHT_COL  # data sheets end at column Y
+HEADER_EVERY = 5_000   # a copy of the header row is pasted in about this often
+
+WORDS = [
+    "SIAM", "GLOBAL", "PACIFIC", "ORIENT", "GOLDEN", "UNITED", "ROYAL", "EASTERN", "STAR", "DRAGON",
+    "LOTUS", "DELTA", "OCEAN", "SUMMIT", "PRIME", "NOBLE", "GREEN", "SILVER", "ASIA", "METRO",
+    "TRADING", "LOGISTICS", "FOODS", "STEEL", "PLASTICS", "CHEMICAL", "TEXTILE", "AGRO", "MOTOR", "ELECTRIC",
+]
+FORMS = ["CO., LTD", "CO LTD", "COMPANY LIMITED", "LIMITED", "PUBLIC CO., LTD", "INC", "CORP", ""]
+
+
+def default_data_dir():
+    return app_data_path("benchmarks")
+
+
+def parse_size(text):
+    text = str(text).lower()
+    if text in SIZES:
+        return SIZES[text]
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1_000)
+    if text.endswith("m"):
+        return int(float(text[:-1]) * 1_000_000)
+    return int(text)
+
+
+def company_names(count, rng):
+    # Distinct companies, some of them written a second way as real data tends to be
+    names = []
+    seen = set()
+    while len(names) < count:
+        base = " ".join(rng.sample(WORDS, rng.choice((1, 2, 2, 3))))
+        name = f"{base} {rng.choice(FORMS)}".strip()
+        if name in seen:
+            base = f"{base} {len(names)}"
+            name = f"{base} {rng.choice(FORMS)}".strip()
+        seen.add(name)
+        names.append(name)
+        if rng.random() < 0.1 and len(names) < count:
+            variant = f"{base.title()} {rng.choice(FORMS).replace(',', '').lower()}".strip()
+            if variant not in seen:
+                seen.add(variant)
+                names.append(variant)
+    return names
+
+
+def dirty_date(year, rng):
+    r = rng.random()
+    date = datetime.datetime(year, rng.randint(1, 12), rng.randint(1, 28))
+    if r < 0.85:
+        return date
+    if r < 0.93:
+        return date.strftime("%Y-%m-%d")
+    if r < 0.96:
+        return (date - datetime.datetime(1899, 12, 30)).days  # Excel serial stored as a number
+    if r < 0.98:
+        return "N/A"
+    return None
+
+
+def dirty_value(rng, scale):
+    r = rng.random()
+    value = round(rng.random() * scale, 3)
+    if r < 0.90:
+        return value
+    if r < 0.95:
+        return str(value)  # number stored as text
+    if r < 0.97:
+        return "-"
+    return None
+
+
+def generate_workbook(path, rows, names=1000, years=(2023,), seed=0, header_every=HEADER_EVERY, sheet_name=None):
+    # Synthetic *_Full.xlsx in the documented layout: date B, exporter E, importer I,
+    # quantity W, weight Y, with repeated header rows and dirty cells
+    rng = random.Random(seed)
+    exporters = company_names(max(1, names // 4), rng)
+    importers = company_names(names, rng)
+    # Skewed popularity: a few companies carry most rows
+    exporter_weights = [1 / (i + 1) for i in range(len(exporters))]
+    importer_weights = [1 / (i + 1) ** 0.8 for i in range(len(importers))]
+
+    header = [f"Column {i + 1}" for i in range(LAST_COL + 1)]
+    header[DATE_COL], header[EXPORTER_COL], header[IMPORTER_COL] = "Date", "Exporter", "Importer"
+    header[QUANTITY_COL], header[WEIGHT_COL] = "Quantity", "Weight"
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name or extract_sheet_name_from_filename(path) or f"TH_{years[0]}")
+    ws.append(header)
+
+    batch = 10_000
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        exporter_picks = rng.choices(exporters, exporter_weights, k=count)
+        importer_picks = rng.choices(importers, importer_weights, k=count)
+        for i in range(count):
+            if header_every and (start + i) % header_every == header_every - 1:
+                ws.append(header)
+                continue
+            row = [None] * (LAST_COL + 1)
+            row[0] = start + i + 1
+            row[DATE_COL] = dirty_date(rng.choice(years), rng)
+            row[EXPORTER_COL] = exporter_picks[i]
+            row[IMPORTER_COL] = importer_picks[i] if rng.random() > 0.005 else None
+            row[QUANTITY_COL] = dirty_value(rng, 500)
+            row[WEIGHT_COL] = dirty_value(rng, 25_000)
+            ws.append(row)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def workbook_path(rows, names, seed=0, data_dir=None):
+    # Named like real input files so the sheet name (TH_2023) is inferred the usual way
+    return os.path.join(data_dir or default_data_dir(), f"TH2023_bench_{rows}_{names}_{seed}_Full.xlsx")
+
+
+def ensure_workbook(rows, names, seed=0, data_dir=None):
+    path = workbook_path(rows, names, seed, data_dir)
+    if not os.path.exists(path):
+        generate_workbook(path, rows, names, seed=seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic *_Full.xlsx workbook for benchmarking.")
+    parser.add_argument("--rows", default="10k", help="Data rows: 10k, 100k, 1m or a number (default: 10k).")
+    parser.add_argument("--names", type=int, default=1000, help="Distinct importer names (default: 1000).")
+    parser.add_argument("--years", type=int, nargs="+", default=[2023], help="Years the dates fall in (default: 2023).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Output file (default: under ~/.monthly_summary/benchmarks).")
+    args = parser.parse_args(argv)
+
+    rows = parse_size(args.rows)
+    path = args.output or workbook_path(rows, args.names, args.seed)
+    generate_workbook(path, rows, args.names, years=args.years, seed=args.seed)
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
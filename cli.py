@@ -0,0 +1,235 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logic.aliases import AliasMap, default_alias_path
+from logic.instrument import RunTrace
+from logic.options import GRAINS, LAYOUTS, MODES, parse_tail
+from logic.paths import extract_sheet_name_from_filename, generate_suggested_output_filename
+from logic.pipeline import export_store_summary, export_summary
+from logic.sidecar import SidecarCache
+from logic.store import AggregateStore, default_store_path
+
+
+def find_input_files(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, "*_Full.xlsx")))
+        elif glob.has_magic(pattern):
+            paths.extend(glob.glob(pattern))
+        else:
+            paths.append(pattern)
+    # Skip Excel lock files such as ~$TH2023_Full.xlsx
+    return sorted({os.path.abspath(p) for p in paths if not os.path.basename(p).startswith("~$")})
+
+
+def process_file(input_path, modes, output_dir=None, streaming=False, alias_map=None, layout="combined", use_sidecar=True, tail=None, grain="month"):
+    start = time.perf_counter()
+    try:
+        sheet_name = extract_sheet_name_from_filename(input_path)
+        if not sheet_name:
+            raise ValueError("cannot infer sheet name from file name")
+        output_name = generate_suggested_output_filename(input_path, modes)
+        output_path = os.path.join(output_dir or os.path.dirname(input_path), output_name)
+        sidecar = SidecarCache() if use_sidecar else None
+        # Rows whose dates cannot be read are left out of every month, so they are reported
+        trace = RunTrace("batch")
+        export_summary(
+            input_path, output_path, sheet_name, modes,
+            streaming=streaming, alias_map=alias_map, layout=layout, sidecar=sidecar, tail=tail, grain=grain, trace=trace,
+        )
+        return input_path, True, time.perf_counter() - start, output_path, trace.unparseable_dates or 0
+    except Exception as e:
+        return input_path, False, time.perf_counter() - start, f"{type(e).__name__}: {e}", None
+
+
+def run_batch(args):
+    inputs = find_input_files(args.inputs)
+    if not inputs:
+        print("No input files found.", file=sys.stderr)
+        return 1
+
+    modes = [m for m in MODES if m in args.modes]
+    alias_map = None if args.no_aliases else AliasMap.load(args.aliases)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(process_file, path, modes, args.output_dir, args.streaming, alias_map, args.layout, not args.no_sidecar, args.tail, args.grain)
+            for path in inputs
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            path, ok, seconds, _, unparseable = result
+            dropped = f", {unparseable:,} rows with unparseable dates left out" if unparseable else ""
+            print(f"[{len(results)}/{len(inputs)}] {'OK' if ok else 'FAILED'} {os.path.basename(path)} ({seconds:.1f}s{dropped})")
+    elapsed = time.perf_counter() - start
+
+    print()
+    name_width = max(len(os.path.basename(path)) for path, *_ in results)
+    for path, ok, seconds, detail, unparseable in sorted(results):
+        status = "OK" if ok else "FAILED"
+        dates = f"{unparseable:,} unparseable dates" if ok else ""
+        print(f"{os.path.basename(path):<{name_width}}  {status:<6}  {seconds:8.1f}s  {dates:<24}  {detail}")
+
+    failed = sum(1 for _, ok, *_ in results if not ok)
+    print(f"\n{len(results) - failed} succeeded, {failed} failed in {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def run_cache_list(args):
+    entries = SidecarCache().entries()
+    if not entries:
+        print("Sidecar cache is empty.")
+        return 0
+    for entry in entries:
+        if entry["status"] == "invalid":
+            print(f"{'invalid':<14}  {os.path.basename(entry['base'])}")
+            continue
+        print(
+            f"{entry['status']:<14}  {format_bytes(entry['bytes']):>9}  {entry['rows']:>9} rows  "
+            f"{entry['format']:<7}  {entry['source']} [{entry['sheet']}]"
+        )
+    total = sum(entry.get("bytes", 0) for entry in entries)
+    print(f"\n{len(entries)} entries, {format_bytes(total)} in {SidecarCache().cache_dir}")
+    return 0
+
+
+def run_cache_purge(args):
+    removed = SidecarCache().purge(stale_only=not args.all)
+    print(f"Removed {removed} sidecar {'entry' if removed == 1 else 'entries'}.")
+    return 0
+
+
+def run_store_load(args):
+    store = AggregateStore(args.store)
+    sidecar = None if args.no_sidecar else SidecarCache()
+    failed = 0
+    for path in find_input_files(args.inputs):
+        sheet_name = extract_sheet_name_from_filename(path)
+        try:
+            if not sheet_name:
+                raise ValueError("cannot infer sheet name from file name")
+            status, source = store.load_file(path, sheet_name, sidecar=sidecar)
+            print(f"{status:<10}  {os.path.basename(path)} [{sheet_name}]  {source['rows']} rows")
+        except Exception as e:
+            failed += 1
+            print(f"{'FAILED':<10}  {os.path.basename(path)}  {type(e).__name__}: {e}")
+    return 1 if failed else 0
+
+
+def run_store_list(args):
+    sources = AggregateStore(args.store).sources()
+    if not sources:
+        print("Aggregate store is empty.")
+        return 0
+    for source in sources:
+        loaded = time.strftime("%Y-%m-%d %H:%M", time.localtime(source["loaded_at"]))
+        print(
+            f"{source['id']:>4}  {source['country']:<4} {source['sheet']:<10} {source['rows']:>9} rows  "
+            f"loaded {loaded}  {source['sha256'][:12]}  {source['path']}"
+        )
+    return 0
+
+
+def run_store_remove(args):
+    store = AggregateStore(args.store)
+    removed = sum(1 for source_id in args.ids if store.remove_source(source_id))
+    print(f"Removed {removed} source{'' if removed == 1 else 's'}.")
+    return 0
+
+
+def run_store_export(args):
+    store = AggregateStore(args.store)
+    modes = [m for m in MODES if m in args.modes]
+    alias_map = None if args.no_aliases else AliasMap.load(args.aliases)
+    output_path = args.output or generate_suggested_output_filename(
+        f"{args.country.upper()}{args.year[0] if args.year else ''}", modes
+    )
+    export_store_summary(store, output_path, args.country, modes, years=args.year, alias_map=alias_map, layout=args.layout, tail=args.tail)
+    print(f"Summary exported to {output_path}")
+    return 0
+
+
+def tail_option(value):
+    try:
+        parse_tail(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Monthly Summary command line tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="Summarize a folder or glob of *_Full.xlsx files without the GUI.")
+    batch.add_argument("inputs", nargs="+", help="Directories (searched for *_Full.xlsx), glob patterns or files.")
+    batch.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes (default: CPU count).")
+    batch.add_argument("-m", "--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to export (default: both).")
+    batch.add_argument("-o", "--output-dir", help="Folder for output files (default: next to each input).")
+    batch.add_argument("--layout", choices=list(LAYOUTS), default="combined", help="Month layout for multi-year sheets (default: combined).")
+    batch.add_argument("--grain", choices=list(GRAINS), default="month", help="Period columns: months, quarters, ISO weeks or days (default: month).")
+    batch.add_argument("--tail", type=tail_option, default="all", help="Keep only the largest names and sum the rest into one Others row: top_N or share_P (percent of the total), e.g. top_1000 or share_99 (default: all).")
+    batch.add_argument("--streaming", action="store_true", help="Use the low-memory streaming reader.")
+    batch.add_argument("--aliases", default=default_alias_path(), help="Alias map applied before grouping (default: the app's saved aliases).")
+    batch.add_argument("--no-aliases", action="store_true", help="Do not apply any alias map.")
+    batch.add_argument("--no-sidecar", action="store_true", help="Do not read or write the columnar sidecar cache.")
+    batch.set_defaults(func=run_batch)
+
+    cache = subparsers.add_parser("cache", help="Inspect or purge the columnar sidecar cache of parsed sheets.")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+    cache_list = cache_commands.add_parser("list", help="List cached sheets and whether their workbook has changed.")
+    cache_list.set_defaults(func=run_cache_list)
+    cache_purge = cache_commands.add_parser("purge", help="Remove stale entries (workbook changed or missing).")
+    cache_purge.add_argument("--all", action="store_true", help="Remove every entry, not only stale ones.")
+    cache_purge.set_defaults(func=run_cache_purge)
+
+    store = subparsers.add_parser("store", help="Incremental aggregate store of monthly totals (SQLite).")
+    store.add_argument("--store", default=default_store_path(), help="Store file (default: the app's aggregate store).")
+    store_commands = store.add_subparsers(dest="store_command", required=True)
+    store_load = store_commands.add_parser("load", help="Merge workbooks into the store; files already loaded are skipped.")
+    store_load.add_argument("inputs", nargs="+", help="Directories (searched for *_Full.xlsx), glob patterns or files.")
+    store_load.add_argument("--no-sidecar", action="store_true", help="Do not read or write the columnar sidecar cache.")
+    store_load.set_defaults(func=run_store_load)
+    store_list = store_commands.add_parser("list", help="List the workbooks merged into the store.")
+    store_list.set_defaults(func=run_store_list)
+    store_remove = store_commands.add_parser("remove", help="Take workbooks back out of the store by id (see 'store list').")
+    store_remove.add_argument("ids", nargs="+", type=int)
+    store_remove.set_defaults(func=run_store_remove)
+    store_export = store_commands.add_parser("export", help="Write the summary workbook straight from the store.")
+    store_export.add_argument("country", help="Country short name, e.g. TH.")
+    store_export.add_argument("-y", "--year", nargs="+", type=int, help="Only these years (default: every stored year).")
+    store_export.add_argument("-m", "--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to export (default: both).")
+    store_export.add_argument("-o", "--output", help="Output file (default: <country><year>_im_ex_per_month.xlsx).")
+    store_export.add_argument("--layout", choices=list(LAYOUTS), default="combined", help="Month layout (default: combined).")
+    store_export.add_argument("--tail", type=tail_option, default="all", help="Keep only the largest names and sum the rest into one Others row: top_N or share_P (percent of the total), e.g. top_1000 or share_99 (default: all).")
+    store_export.add_argument("--aliases", default=default_alias_path(), help="Alias map applied before grouping (default: the app's saved aliases).")
+    store_export.add_argument("--no-aliases", action="store_true", help="Do not apply any alias map.")
+    store_export.set_defaults(func=run_store_export)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,71 @@
-from logic.summarizer import read_and_summarize
-from logic.utils import generate_suggested_output_filename, extract_sheet_name_from_filename, format_sheet
-from gui.preview_window import PreviewWindow
+from logic.options import GRAINS, LAYOUTS, TAILS, TYPES
+from logic.instrument import RunTrace, default_log_path, default_profile_path, profiled
+from logic.aliases import AliasMap
+from logic.paths import generate_suggested_output_filename, extract_sheet_name_from_filename, split_sheet_name
 from gui.preview_type_dialog import PreviewTypeDialog
+from gui.job_runner import JobRunner, JobCancelled
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
+import importlib
 import os
+import threading
+
+# pandas, numpy and openpyxl take seconds to import on slow machines, so modules that need
+# them are imported on first use, or warmed in the background once the window is up
+HEAVY_MODULES = ("logic.pipeline", "logic.sheet_cache", "logic.sidecar", "logic.store", "logic.summary", "gui.preview_window")
+
+
+def warm_heavy_modules():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            return  # the real error is reported when the module is first used
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, warm_imports=True):
         super().__init__()
         self.title("Monthly Summary")
         self.geometry("600x750")
-        self.resizable(False, False)
+        self.minsize(600, 400)
+        self.resizable(False, True)
 
         self.selected_modes = {"Importer": False, "Exporter": False}
-        # Store dict like: {"Importer": {"Weight": df, "Quantity": df}, "Exporter": {...}}
+        # Store dict like: {"Importer": {"Weight": summary, "Quantity": summary}, "Exporter": {...}}.
+        # Summaries are kept compact (logic.summary) with one name table shared by all of them,
+        # and turned back into frames only to open a preview or write the export
         self.previewed_data = {
             "Importer": {"Weight": None, "Quantity": None},
             "Exporter": {"Weight": None, "Quantity": None},
         }
+        self.name_table = None
+        # Day-level totals behind the previews, per mode, so a preview can switch grain at once
+        self.day_cubes = {}
+        # Parsed input sheets shared by every preview and export until the file changes,
+        # and the aggregate store; both are created on first use (see get_sheet_cache)
+        self._sheet_cache = None
+        self._store = None
+        self._backend_lock = threading.Lock()
+        # Merges made in previews, applied to every later summary before grouping
+        try:
+            self.alias_map = AliasMap.load()
+        except Exception as e:
+            messagebox.showwarning("Aliases", f"Failed to load saved aliases, starting empty: {e}")
+            self.alias_map = AliasMap()
+
+        # The options outgrew a laptop screen, so they scroll above the status bar
+        body = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True)
 
         ctk.CTkLabel(
-            self,
+            body,
             text="Summarize monthly import/export weights and quantities.",
             wraplength=560,
             justify="left",
             font=ctk.CTkFont(size=14),
         ).pack(pady=(15, 5), padx=10)
 
-        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame = ctk.CTkFrame(body, fg_color="transparent")
         button_frame.pack(pady=(0, 10))
         self.importer_btn = ctk.CTkButton(button_frame, text="Importer", command=self.toggle_importer, width=120)
         self.importer_btn.grid(row=0, column=0, padx=10)
@@ -37,37 +73,115 @@ class App(ctk.CTk):
         self.exporter_btn.grid(row=0, column=1, padx=10)
 
         # Preview Buttons with added dropdown
-        ctk.CTkButton(button_frame, text="Preview Importer", command=lambda: self.ask_preview_type("Importer")).grid(row=1, column=0, pady=5)
-        ctk.CTkButton(button_frame, text="Preview Exporter", command=lambda: self.ask_preview_type("Exporter")).grid(row=1, column=1, pady=5)
+        self.preview_importer_btn = ctk.CTkButton(button_frame, text="Preview Importer", command=lambda: self.ask_preview_type("Importer"))
+        self.preview_importer_btn.grid(row=1, column=0, pady=5)
+        self.preview_exporter_btn = ctk.CTkButton(button_frame, text="Preview Exporter", command=lambda: self.ask_preview_type("Exporter"))
+        self.preview_exporter_btn.grid(row=1, column=1, pady=5)
 
-        self.mode_label = ctk.CTkLabel(self, text="Mode: None selected", font=ctk.CTkFont(weight="bold"))
+        self.mode_label = ctk.CTkLabel(body, text="Mode: None selected", font=ctk.CTkFont(weight="bold"))
         self.mode_label.pack(pady=(0, 10))
 
         self.input_path_var = ctk.StringVar()
-        ctk.CTkLabel(self, text="Input Excel file:").pack()
-        input_frame = ctk.CTkFrame(self)
+        ctk.CTkLabel(body, text="Input Excel file:").pack()
+        input_frame = ctk.CTkFrame(body)
         input_frame.pack(padx=20, fill="x")
         self.input_entry = ctk.CTkEntry(input_frame, textvariable=self.input_path_var, width=400, state="readonly")
         self.input_entry.pack(side="left", padx=(10, 5), pady=10)
         ctk.CTkButton(input_frame, text="Browse", command=self.browse_input_file).pack(side="left", padx=5)
 
         self.sheet_name_var = ctk.StringVar(value="")
-        ctk.CTkLabel(self, text="Sheet name:").pack(pady=(5, 3))
-        self.sheet_entry = ctk.CTkEntry(self, textvariable=self.sheet_name_var, width=150)
+        ctk.CTkLabel(body, text="Sheet name:").pack(pady=(5, 3))
+        self.sheet_entry = ctk.CTkEntry(body, textvariable=self.sheet_name_var, width=150)
         self.sheet_entry.pack()
 
+        # Streaming keeps memory bounded by the number of names instead of rows
+        self.streaming_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(body, text="Low-memory streaming mode (very large files)", variable=self.streaming_var).pack(pady=(10, 0))
+
+        # Run Summary merges the file into the aggregate store and exports from the stored totals
+        self.use_store_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(body, text="Export from the aggregate store", variable=self.use_store_var).pack(pady=(10, 0))
+
+        # Multi-year sheets can be summarized per year or as a rolling window
+        layout_frame = ctk.CTkFrame(body, fg_color="transparent")
+        layout_frame.pack(pady=(10, 0))
+        ctk.CTkLabel(layout_frame, text="Month layout:").grid(row=0, column=0, padx=5)
+        self.layout_var = ctk.StringVar(value=LAYOUTS["combined"])
+        self.layout_menu = ctk.CTkOptionMenu(
+            layout_frame, values=list(LAYOUTS.values()), variable=self.layout_var, command=self.on_layout_change, width=220
+        )
+        self.layout_menu.grid(row=0, column=1, padx=5)
+
+        # Big markets have long tails of tiny names; previews and exports can fold them into "Others"
+        ctk.CTkLabel(layout_frame, text="Names:").grid(row=1, column=0, padx=5, pady=(5, 0))
+        self.tail_var = ctk.StringVar(value=TAILS["all"])
+        self.tail_menu = ctk.CTkOptionMenu(
+            layout_frame, values=list(TAILS.values()), variable=self.tail_var, command=self.on_layout_change, width=220
+        )
+        self.tail_menu.grid(row=1, column=1, padx=5, pady=(5, 0))
+
+        # Summaries are rolled up from day-level totals, so any grain costs one read
+        ctk.CTkLabel(layout_frame, text="Periods:").grid(row=2, column=0, padx=5, pady=(5, 0))
+        self.grain_var = ctk.StringVar(value=GRAINS["month"])
+        self.grain_menu = ctk.CTkOptionMenu(
+            layout_frame, values=list(GRAINS.values()), variable=self.grain_var, command=self.on_layout_change, width=220
+        )
+        self.grain_menu.grid(row=2, column=1, padx=5, pady=(5, 0))
+
         self.output_path_var = ctk.StringVar()
-        ctk.CTkLabel(self, text="Output Excel file:").pack(pady=(15, 3))
-        output_frame = ctk.CTkFrame(self)
+        ctk.CTkLabel(body, text="Output Excel file:").pack(pady=(15, 3))
+        output_frame = ctk.CTkFrame(body)
         output_frame.pack(padx=20, fill="x")
         self.output_entry = ctk.CTkEntry(output_frame, textvariable=self.output_path_var, width=400, state="readonly")
         self.output_entry.pack(side="left", padx=(10, 5), pady=10)
         ctk.CTkButton(output_frame, text="Save As", command=self.browse_output_file).pack(side="left", padx=5)
 
-        self.run_summary_btn = ctk.CTkButton(self, text="Run Summary", command=self.run_summary)
+        alias_frame = ctk.CTkFrame(body, fg_color="transparent")
+        alias_frame.pack(pady=(10, 0))
+        ctk.CTkButton(alias_frame, text="Import Aliases", command=self.import_aliases, width=130).grid(row=0, column=0, padx=5)
+        ctk.CTkButton(alias_frame, text="Export Aliases", command=self.export_aliases, width=130).grid(row=0, column=1, padx=5)
+        self.alias_label = ctk.CTkLabel(alias_frame, text="")
+        self.alias_label.grid(row=0, column=2, padx=10)
+        # A mistaken merge would otherwise be applied to every later summary
+        self.clear_aliases_btn = ctk.CTkButton(alias_frame, text="Clear Aliases", command=self.clear_aliases, width=130)
+        self.clear_aliases_btn.grid(row=1, column=0, padx=5, pady=(5, 0))
+        self.update_alias_label()
+
+        self.run_summary_btn = ctk.CTkButton(body, text="Run Summary", command=self.run_summary)
         self.run_summary_btn.pack(pady=20)
         self.run_summary_btn.configure(state="disabled")  # initially disabled
 
+        # Progress of the background preview/export job
+        progress_frame = ctk.CTkFrame(body, fg_color="transparent")
+        progress_frame.pack(padx=20, fill="x")
+        self.progress_bar = ctk.CTkProgressBar(progress_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(side="left", fill="x", expand=True, padx=(10, 5))
+        self.cancel_btn = ctk.CTkButton(progress_frame, text="Cancel", width=80, command=self.cancel_job, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.stage_label = ctk.CTkLabel(body, text="Idle")
+        self.stage_label.pack(pady=(5, 0))
+
+        # Opt-in cProfile dump of the next preview/export only
+        self.profile_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(body, text="Profile the next run (cProfile)", variable=self.profile_var).pack(pady=(5, 0))
+
+        # Status bar: per-stage timings of the last run; every run is also logged as JSON lines
+        status_frame = ctk.CTkFrame(self)
+        status_frame.pack(side="bottom", fill="x", before=body)
+        self.status_label = ctk.CTkLabel(status_frame, text="No runs yet", anchor="w", wraplength=480, justify="left")
+        self.status_label.pack(side="left", fill="x", expand=True, padx=10, pady=3)
+        ctk.CTkButton(status_frame, text="Details", width=70, command=self.show_run_details).pack(side="right", padx=5, pady=3)
+        self.memory_label = ctk.CTkLabel(status_frame, text="")
+        self.memory_label.pack(side="right", padx=5, pady=3)
+        self.update_memory_label()
+        self.last_trace = None
+
+        self.jobs = JobRunner(self)
+
+        if warm_imports:
+            self.after(200, lambda: threading.Thread(target=warm_heavy_modules, daemon=True).start())
+
         self.full_input_path = ""
         self.full_output_path = ""
 
@@ -110,7 +224,7 @@ class App(ctk.CTk):
             suggested_name = generate_suggested_output_filename(self.input_path_var.get(), active)
             self.full_output_path = os.path.join(folder, suggested_name)
             self.output_path_var.set(suggested_name)  # show only the name
-            self.run_summary_btn.configure(state="normal")
+            self.run_summary_btn.configure(state="disabled" if self.jobs.busy else "normal")
         else:
             self.output_path_var.set("")
             self.run_summary_btn.configure(state="disabled")
@@ -134,10 +248,7 @@ class App(ctk.CTk):
                 self.sheet_name_var.set(sheet_name)
 
             # Reset previous preview data since input changed
-            self.previewed_data = {
-                "Importer": {"Weight": None, "Quantity": None},
-                "Exporter": {"Weight": None, "Quantity": None},
-            }
+            self.reset_previews()
 
             # Generate output path in same folder
             selected_modes = [k for k, v in self.selected_modes.items() if v]
@@ -158,40 +269,300 @@ class App(ctk.CTk):
             self.output_path_var.set(os.path.basename(path))  # show only file name
             self.full_output_path = path  # store full path internally
 
+    def selected_layout(self):
+        return next(key for key, label in LAYOUTS.items() if label == self.layout_var.get())
+
+    def selected_grain(self):
+        return next(key for key, label in GRAINS.items() if label == self.grain_var.get())
+
+    def selected_tail(self):
+        return next(key for key, label in TAILS.items() if label == self.tail_var.get())
+
+    def on_layout_change(self, _choice):
+        # Previews were built for the previous layout or tail option; saved aliases keep their merges
+        self.reset_previews()
+
+    def reset_previews(self):
+        self.previewed_data = {
+            "Importer": {"Weight": None, "Quantity": None},
+            "Exporter": {"Weight": None, "Quantity": None},
+        }
+        self.name_table = None
+        self.day_cubes = {}
+        self.update_memory_label()
+
+    def matches_options(self, attrs, layout, tail):
+        # Previews record the layout and tail option they were built with
+        return attrs.get("layout") == layout and attrs.get("tail") == tail
+
+    def keep_preview(self, mode, type_, df, folded=None):
+        from logic.summary import NameTable, Summary
+        # A preview window still open from before an option change can save its stale layout
+        if not self.matches_options(df.attrs, self.selected_layout(), self.selected_tail()):
+            return
+        if self.name_table is None:
+            self.name_table = NameTable()
+        summary = Summary.from_frame(df, self.name_table)
+        if folded is not None:
+            summary.folded = Summary.from_frame(folded, self.name_table)
+        self.previewed_data[mode][type_] = summary
+        self.update_memory_label()
+
+    def update_memory_label(self):
+        # Memory held by kept previews: their code and value arrays plus the shared name table
+        held = [s for summaries in self.previewed_data.values() for s in summaries.values() if s is not None]
+        if not held:
+            self.memory_label.configure(text="No previews held")
+            return
+        size = sum(s.nbytes for s in held) + self.name_table.nbytes + sum(d.nbytes for d in self.day_cubes.values())
+        self.memory_label.configure(text=f"{len(held)} previews held, {size / 2**20:,.1f} MB")
+
+    def update_alias_label(self):
+        self.alias_label.configure(text=f"{len(self.alias_map)} saved aliases")
+
+    def remember_merges(self, mode, merges):
+        for source, target in merges:
+            self.alias_map.add(mode, source, target)
+        if not merges:
+            return
+        try:
+            self.alias_map.save()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save aliases: {e}")
+        self.update_alias_label()
+
+    def import_aliases(self):
+        path = filedialog.askopenfilename(filetypes=[("Alias map", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            added = self.alias_map.merge(AliasMap.load(path))
+            self.alias_map.save()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import aliases: {e}")
+            return
+        self.update_alias_label()
+        messagebox.showinfo("Aliases", f"Imported {added} aliases.")
+
+    def clear_aliases(self):
+        if not len(self.alias_map):
+            return
+        if not messagebox.askyesno("Aliases", f"Remove all {len(self.alias_map)} saved aliases? Export them first to keep a copy."):
+            return
+        self.alias_map.clear()
+        try:
+            self.alias_map.save()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save aliases: {e}")
+        # Previews were summarized with the old aliases applied
+        self.reset_previews()
+        self.update_alias_label()
+
+    def export_aliases(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Alias map", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.alias_map.save(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export aliases: {e}")
+
     def ask_preview_type(self, mode):
         # Open small dialog with Weight and Quantity buttons
         PreviewTypeDialog(self, mode, self.preview_data)
 
+    def get_sheet_cache(self):
+        # Called from worker threads, so the first (slow) import happens off the Tk thread
+        with self._backend_lock:
+            if self._sheet_cache is None:
+                from logic.sheet_cache import SheetCache
+                from logic.sidecar import SidecarCache
+                self._sheet_cache = SheetCache(sidecar=SidecarCache())
+            return self._sheet_cache
+
+    def get_store(self):
+        # Monthly totals of every workbook run through the store, merged incrementally
+        with self._backend_lock:
+            if self._store is None:
+                from logic.store import AggregateStore
+                self._store = AggregateStore()
+            return self._store
+
+    def traced_job(self, func, trace):
+        # Times the job's stages into trace, optionally under cProfile, and logs the run
+        profile_path = default_profile_path(trace.name) if self.profile_var.get() else None
+        if profile_path:
+            self.profile_var.set(False)
+            trace.context["profile"] = profile_path
+
+        def job(report):
+            status = "error"
+            try:
+                with profiled(profile_path):
+                    result = func(report, trace)
+                status = "ok"
+                return result
+            except JobCancelled:
+                status = "cancelled"
+                raise
+            finally:
+                trace.finish(status)
+                try:
+                    trace.write()
+                except OSError:
+                    pass  # a missing log must never fail the run itself
+
+        return job
+
+    def show_trace(self, trace):
+        self.last_trace = trace
+        text = trace.summary()
+        if trace.status != "ok":
+            text += f" ({trace.status})"
+        self.status_label.configure(text=text)
+
+    def show_run_details(self):
+        trace = self.last_trace
+        if trace is None:
+            messagebox.showinfo("Run details", f"No runs yet.\n\nRuns are logged to {default_log_path()}")
+            return
+        lines = [f"{trace.name} ({trace.status})", ""]
+        for s in trace.stages:
+            rows = f"{s['rows']:,} rows" if s["rows"] is not None else ""
+            memory = f"{s['rss_change_mb']:+,.0f} MB (to {s['rss_mb']:,.0f} MB)" if s["rss_change_mb"] is not None else ""
+            lines.append(f"{s['stage']:<20} {s['seconds']:8.3f}s  {rows:>14}  {memory}")
+        lines += ["", trace.summary(), "", f"Log: {default_log_path()}"]
+        if trace.context.get("profile"):
+            lines.append(f"Profile: {trace.context['profile']}")
+        messagebox.showinfo("Run details", "\n".join(lines))
+
+    def start_job(self, title, func, on_success, error_message, trace=None):
+        if trace is not None:
+            func = self.traced_job(func, trace)
+        self.set_busy(True)
+        self.stage_label.configure(text=title)
+        self.progress_bar.set(0)
+
+        def on_error(e):
+            self.stage_label.configure(text="Failed")
+            messagebox.showerror("Error", f"{error_message}: {e}")
+
+        def on_cancel():
+            self.stage_label.configure(text="Cancelled")
+
+        def on_success_done(result):
+            self.stage_label.configure(text="Done")
+            self.progress_bar.set(1)
+            on_success(result)
+
+        self.jobs.start(
+            func,
+            on_success_done,
+            on_error=on_error,
+            on_progress=self.on_job_progress,
+            on_cancel=on_cancel,
+            on_finish=lambda: self.on_job_finish(trace),
+        )
+
+    def on_job_finish(self, trace):
+        self.set_busy(False)
+        if trace is not None:
+            self.show_trace(trace)
+
+    def on_job_progress(self, stage, fraction=None):
+        self.stage_label.configure(text=stage)
+        if fraction is not None:
+            self.progress_bar.set(fraction)
+
+    def cancel_job(self):
+        self.stage_label.configure(text="Cancelling...")
+        self.cancel_btn.configure(state="disabled")
+        self.jobs.cancel()
+
+    def set_busy(self, busy):
+        # Keep Run/Preview disabled while a job owns the input
+        state = "disabled" if busy else "normal"
+        self.preview_importer_btn.configure(state=state)
+        self.preview_exporter_btn.configure(state=state)
+        self.clear_aliases_btn.configure(state=state)
+        # Changing an option mid-job would leave the job's result built with the old one
+        for menu in (self.layout_menu, self.tail_menu, self.grain_menu):
+            menu.configure(state=state)
+        can_run = not busy and any(self.selected_modes.values()) and bool(self.input_path_var.get())
+        self.run_summary_btn.configure(state="normal" if can_run else "disabled")
+        self.cancel_btn.configure(state="normal" if busy else "disabled")
+
     def preview_data(self, mode, type_):
         if not self.input_path_var.get() or not self.sheet_name_var.get():
             messagebox.showerror("Error", "Please select input file and sheet name first.")
             return
 
+        def on_combine_done(new_df, merges, folded=None):
+            self.keep_preview(mode, type_, new_df, folded)
+            self.remember_merges(mode, merges)
+
         # ✅ If preview already exists, use it directly
         existing_preview = self.previewed_data[mode][type_]
         if existing_preview is not None:
-            df_result = existing_preview
-        else:
-            try:
-                df = pd.read_excel(self.full_input_path, sheet_name=self.sheet_name_var.get())
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to read Excel: {e}")
-                return
-
-            name_col_index = 8 if mode == "Importer" else 4
-            value_col_index = 24 if type_.lower() == "weight" else 23
-
-            try:
-                df_result = read_and_summarize(df, name_col_index, value_col_index)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to process data: {e}")
-                return
-            self.previewed_data[mode][type_] = df_result
-
-        def on_combine_done(new_df):
-            self.previewed_data[mode][type_] = new_df
+            from gui.preview_window import PreviewWindow
+            folded = existing_preview.folded.to_frame() if existing_preview.folded is not None else None
+            PreviewWindow(
+                self, f"{mode} - {type_}", existing_preview.to_frame(), on_combine_done, folded,
+                self.regrainer(mode, type_, self.selected_layout(), self.selected_tail()),
+            )
+            return
 
-        PreviewWindow(self, f"{mode} - {type_}", df_result, on_combine_done)
+        # Tk variables are read here, on the GUI thread, before the worker starts
+        input_path = self.full_input_path
+        sheet_name = self.sheet_name_var.get()
+        streaming = self.streaming_var.get()
+        layout = self.selected_layout()
+        tail = self.selected_tail()
+        grain = self.selected_grain()
+        aliases = self.alias_map.mapping(mode)
+
+        def job(report, trace):
+            from logic.pipeline import mode_layout, summarize_mode_days
+            from logic.summarizer import compact_tail
+            # Both metrics are kept at day level, so either preview can switch grain without a re-read
+            days = summarize_mode_days(
+                input_path, sheet_name, mode,
+                streaming=streaming, sheet_cache=self.get_sheet_cache(), progress=report, aliases=aliases, trace=trace,
+            )
+            summary = mode_layout(days, [type_], layout, grain, trace=trace)[type_]
+            summary.attrs.update(grain=grain, layout=layout, tail=tail)
+            # Only the kept names go into the Treeview; the folded ones open from the preview
+            with trace.stage("compact", len(summary)):
+                return (days, *compact_tail(summary, tail))
+
+        def on_success(result):
+            from gui.preview_window import PreviewWindow
+            days, df_result, folded = result
+            # Input and options not changed while running
+            if input_path == self.full_input_path and (layout, tail) == (self.selected_layout(), self.selected_tail()):
+                self.day_cubes[mode] = days
+                self.keep_preview(mode, type_, df_result, folded)
+            regrain = self.regrainer(mode, type_, layout, tail, days)
+            PreviewWindow(self, f"{mode} - {type_}", df_result, on_combine_done, folded, regrain)
+
+        trace = RunTrace("preview", {"file": os.path.basename(input_path), "sheet": sheet_name, "mode": mode, "type": type_})
+        self.start_job(f"Preparing {mode} {type_.lower()} preview", job, on_success, "Failed to process data", trace)
+
+    def regrainer(self, mode, type_, layout, tail, days=None):
+        # Lays a preview's day-level totals out at another grain without re-reading the sheet.
+        # Aliases saved since the totals were built are applied, so earlier merges carry over.
+        days = days if days is not None else self.day_cubes.get(mode)
+        if days is None:
+            return None
+
+        def regrain(grain):
+            from logic.pipeline import mode_layout
+            from logic.summarizer import compact_tail
+            summary = mode_layout(days, [type_], layout, grain, aliases=self.alias_map.mapping(mode))[type_]
+            summary.attrs.update(grain=grain, layout=layout, tail=tail)
+            return compact_tail(summary, tail)
+
+        return regrain
 
     def run_summary(self):
         if not any(self.selected_modes.values()):
@@ -211,38 +582,79 @@ class App(ctk.CTk):
             self.full_output_path = os.path.join(input_dir, suggested_name)
             self.output_path_var.set(suggested_name)  # show only filename in UI
 
-        try:
-            output_path = self.full_output_path
-            sheet_names = []  # Store sheet info for formatting later
-
-            with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-                for mode, selected in self.selected_modes.items():
-                    if not selected:
-                        continue
-                    for type_ in ["Weight", "Quantity"]:
-                        df_preview = self.previewed_data[mode][type_]
-
-                        # If not previewed yet, read and summarize
-                        if df_preview is None:
-                            try:
-                                df = pd.read_excel(self.full_input_path, sheet_name=self.sheet_name_var.get())
-                            except Exception as e:
-                                messagebox.showerror("Error", f"Failed to read Excel: {e}")
-                                return
-
-                            name_col_index = 8 if mode == "Importer" else 4
-                            value_col_index = 24 if type_.lower() == "weight" else 23
-                            df_preview = read_and_summarize(df, name_col_index, value_col_index)
-
-                        sheet_name = f"{mode.lower()}_{type_.lower()}"
-                        df_preview.to_excel(writer, sheet_name=sheet_name)
-                        sheet_names.append((sheet_name, mode, type_))  # Save for formatting
-
-            # After saving, apply formatting
-            for sheet_name, mode, type_ in sheet_names:
-                format_sheet(output_path, sheet_name, mode, type_)
-
-            messagebox.showinfo("Success", f"Summary exported successfully to {output_path}")
+        output_path = self.full_output_path
+        input_path = self.full_input_path
+        sheet_name = self.sheet_name_var.get()
+        streaming = self.streaming_var.get()
+        layout = self.selected_layout()
+        tail = self.selected_tail()
+        grain = self.selected_grain()
+        modes = [k for k, v in self.selected_modes.items() if v]
+        aliases = {mode: self.alias_map.mapping(mode) for mode in modes}
+        use_store = self.use_store_var.get()
+        if use_store and grain != "month":
+            messagebox.showerror("Error", "The aggregate store keeps monthly totals. Choose Months to export from it.")
+            return
+        # Previews built with other options are summarized again; their merges are saved aliases.
+        # The store spans other files and years, so every sheet comes from it when it is used
+        previewed = {mode: {} for mode in modes}
+        if not use_store:
+            previewed = {
+                mode: {
+                    t: s for t, s in self.previewed_data[mode].items()
+                    if s is not None and s.attrs.get("grain", "month") == grain and self.matches_options(s.attrs, layout, tail)
+                }
+                for mode in modes
+            }
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export summary: {e}")
\ No newline at end of file
+        def job(report, trace):
+            from logic.pipeline import export_frame, mode_layout, summarize_modes_days, write_output
+            from logic.summarizer import round_summary
+            sheet_cache = self.get_sheet_cache()
+            store = self.get_store() if use_store else None
+            if store is not None:
+                # A workbook already merged and unchanged since is not read again
+                if store.recorded_source(input_path, sheet_name) is None:
+                    report(f"Merging {sheet_name} into the aggregate store")
+                    with trace.stage("store merge"):
+                        store.load_file(input_path, sheet_name, progress=report, sidecar=sheet_cache.sidecar)
+                country, year = split_sheet_name(sheet_name)
+                # The combined layout is the sheet's own 12 months; other layouts span every stored year
+                years = [year] if layout == "combined" and year else None
+
+            # Every metric not previewed yet, summarized from a single read of the sheet
+            missing = {mode: [t for t in TYPES if t not in previewed[mode]] for mode in modes}
+            days = {}
+            if store is None and any(missing.values()):
+                days = summarize_modes_days(
+                    input_path, sheet_name, [m for m in modes if missing[m]], [t for t in TYPES if any(t in types for types in missing.values())],
+                    streaming=streaming, sheet_cache=sheet_cache, progress=report, aliases=aliases, trace=trace,
+                )
+
+            sheets = []  # (sheet_name, mode, unit, df) written in a single formatted pass
+            for i, mode in enumerate(modes):
+                report(f"Summarizing {mode}", i / (len(modes) + 1))
+                # Previews are already compacted with the current tail option
+                summaries = {t: round_summary(s.to_frame()) for t, s in previewed[mode].items()}
+
+                if missing[mode] and store is not None:
+                    with trace.stage("store read"):
+                        computed = store.summarize(country, mode, missing[mode], years=years, aliases=aliases[mode], layout=layout)
+                elif missing[mode]:
+                    computed = mode_layout(days[mode], missing[mode], layout, grain, trace=trace)
+                for type_ in missing[mode]:
+                    # Fixed-point summaries are compacted and rounded once, here at export
+                    summaries[type_] = export_frame(computed[type_], tail, trace)
+
+                for type_ in TYPES:
+                    sheets.append((f"{mode.lower()}_{type_.lower()}", mode, type_, summaries[type_]))
+
+            report("Writing output", len(modes) / (len(modes) + 1))
+            write_output(output_path, sheets, trace)
+            return output_path
+
+        def on_success(path):
+            messagebox.showinfo("Success", f"Summary exported successfully to {path}")
+
+        trace = RunTrace("export", {"file": os.path.basename(input_path), "sheet": sheet_name, "modes": modes, "layout": layout, "grain": grain})
+        self.start_job("Running summary", job, on_success, "Failed to export summary", trace)
@@ -0,0 +1,85 @@
+import queue
+import threading
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Runs one background job at a time on a worker thread; results come back through a
+# queue that is polled with after(), so callbacks always run on the Tk thread
+class JobRunner:
+    def __init__(self, widget, poll_ms=100):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = None
+        self._callbacks = None
+
+    @property
+    def busy(self):
+        return self._thread is not None
+
+    def start(self, func, on_success, on_error=None, on_progress=None, on_cancel=None, on_finish=None):
+        # func(report) runs on a worker thread; report(stage, fraction) raises JobCancelled once cancelled
+        if self.busy:
+            raise RuntimeError("A job is already running.")
+        self._cancel_event.clear()
+        self._callbacks = {
+            "success": on_success,
+            "error": on_error,
+            "progress": on_progress,
+            "cancelled": on_cancel,
+            "finish": on_finish,
+        }
+        self._thread = threading.Thread(target=self._run, args=(func,), daemon=True)
+        self._thread.start()
+        self.widget.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _report(self, stage, fraction=None):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        self._queue.put(("progress", (stage, fraction)))
+
+    def _run(self, func):
+        try:
+            # Cancelling is only honoured at report() checkpoints; once func has returned its
+            # work (e.g. a written workbook) is done, so the result is always delivered
+            result = func(self._report)
+            self._queue.put(("success", result))
+        except JobCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+
+    def _poll(self):
+        if not self.widget.winfo_exists():
+            return  # the window closed while the job ran; its result has nowhere to go
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                if self._callbacks["progress"]:
+                    self._callbacks["progress"](*payload)
+                continue
+
+            callbacks = self._callbacks
+            self._thread = None
+            self._callbacks = None
+            if callbacks["finish"]:
+                callbacks["finish"]()
+            if kind == "cancelled":
+                if callbacks["cancelled"]:
+                    callbacks["cancelled"]()
+            elif callbacks[kind]:
+                callbacks[kind](payload)
+            return
+
+        self.widget.after(self.poll_ms, self._poll)
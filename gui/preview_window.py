@@ -1,40 +1,127 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from gui.job_runner import JobRunner
+from gui.suggestions_window import SuggestionsWindow
+import bisect
 import numpy as np
+import pandas as pd
+from logic.journal import CombineJournal, RowOrder, combine_many
+from logic.options import GRAINS
+from logic.matching import suggest_merges
+from logic.search import NameIndex
+from logic.summarizer import others_label, round_summary
+
+SORT_ORIGINAL = "Original order"
 
 class PreviewWindow(ctk.CTkToplevel):
-    def __init__(self, parent, mode, dataframe, on_combine_callback):
+    def __init__(self, parent, mode, dataframe, on_combine_callback, folded=None, regrain=None):
         super().__init__(parent)
         self.title(f"{mode} Preview")
         self.geometry("950x550")
         self.mode = mode
-        self.df = dataframe.copy()
         self.on_combine_callback = on_combine_callback
 
-        self.source_name = None
+        # Row model: display order plus one int64 array of fixed-point period values per name
+        self.index_name = dataframe.index.name
+        self.load_frame(dataframe)
+
+        # Names folded into an "Others" row by the tail option open in a preview of their own;
+        # merges made there are saved together with this preview's
+        self.folded = folded
+        self.folded_merges = []
+
+        # regrain(grain) -> (frame, folded) lays the same totals out at another grain
+        self.regrain = regrain
+        self.grain = dataframe.attrs.get("grain", "month")
+
+        # Ctrl-click selects several sources for one target; "Add Group" queues a selection
+        # so several groups are combined together
+        self.source_names = []
         self.target_name = None
+        self.queued = {}  # source -> target
         self.saved = False  # track if user saved
 
-        self.undo_stack = []
+        # Finding merge suggestions runs on a worker thread so the window stays responsive
+        self.jobs = JobRunner(self)
+
+        # Each combine is journaled as a delta, so undo/redo only touch the rows involved.
+        # A whole batch of merges is one grouped sum and one undoable step
+        self.journal = CombineJournal()
+
+        # Only the rows visible in the viewport exist as Treeview items ("slots"); they page
+        # through self.view, the filtered and sorted names, from its end when descending
+        self.offset = 0
+        self.slot_names = []
+        self.view = self.names
+        self.view_descending = False
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+        # Type-ahead filter (trigram index built on the first keystroke) and sort orders,
+        # each computed once and patched as combines change the totals
+        self.name_index = None
+        self.filter_matches = None
+        self.orderings = {}  # sort key -> (names in ascending order, their sort keys, name -> sort key)
+
+        filter_frame = ctk.CTkFrame(self, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkLabel(filter_frame, text="Find:").pack(side="left", padx=(0, 5))
+        self.filter_var = ctk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self.apply_filter())
+        filter_entry = ctk.CTkEntry(filter_frame, textvariable=self.filter_var, width=250)
+        filter_entry.pack(side="left")
+        filter_entry.bind("<Escape>", lambda e: self.filter_var.set(""))
+        self.others_btn = None
+        if folded is not None:
+            self.others_btn = ctk.CTkButton(filter_frame, text=f"Open Others ({len(folded):,})", command=self.open_others, width=120)
+            self.others_btn.pack(side="left", padx=10)
+        if regrain is not None:
+            self.grain_var = ctk.StringVar(value=GRAINS[self.grain])
+            self.grain_menu = ctk.CTkOptionMenu(
+                filter_frame, values=list(GRAINS.values()), variable=self.grain_var, command=self.set_grain, width=110,
+            )
+            self.grain_menu.pack(side="left", padx=10)
+        self.sort_descending_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            filter_frame, text="Descending", variable=self.sort_descending_var, command=self.refresh_view
+        ).pack(side="right", padx=(10, 0))
+        self.sort_var = ctk.StringVar(value=SORT_ORIGINAL)
+        self.sort_menu = ctk.CTkOptionMenu(
+            filter_frame, values=[SORT_ORIGINAL], variable=self.sort_var, command=lambda _: self.refresh_view(), width=140,
+        )
+        self.sort_menu.pack(side="right")
+        ctk.CTkLabel(filter_frame, text="Sort by:").pack(side="right", padx=5)
+
+        tree_frame = ctk.CTkFrame(self, fg_color="transparent")
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=(10, 0))
 
         # Treeview for preview data
-        self.tree = ttk.Treeview(self, show="tree headings")
-        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+        self.tree = ttk.Treeview(tree_frame, show="tree headings", selectmode="none")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        # Multi-year layouts can be wider than the window
+        x_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
 
-        # Setup columns: 12 months
-        month_cols = [f"{m:02d}" for m in range(1, 13)]
-        self.tree["columns"] = month_cols
         self.tree.column("#0", width=150, anchor="w")
-        for col in month_cols:
-            self.tree.column(col, width=60, anchor="center")
-            self.tree.heading(col, text=col)
+        self.tree.heading("#0", text="Name", command=lambda: self.sort_by_heading("Name"))
+        self.setup_columns()
+        self.tree.tag_configure("source", background="lightgreen")
+        self.tree.tag_configure("target", background="lightblue")
 
         # Label showing total rows count - IMPORTANT: create before populate_treeview()
         self.row_count_label = ctk.CTkLabel(self, text="")
         self.row_count_label.pack(side="bottom", anchor="w", padx=10, pady=5)
 
-        # Bind row click
+        # Bind row click, scrolling and resizing of the viewport
         self.tree.bind("<Button-1>", self.on_row_click)
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3))
 
         # Controls for combine, clearing selection, undo and save
         control_frame = ctk.CTkFrame(self)
@@ -59,117 +146,523 @@ class PreviewWindow(ctk.CTkToplevel):
 
         ctk.CTkButton(control_frame, text="Save", command=self.save_and_close).grid(row=0, column=8, padx=10)
 
+        self.redo_btn = ctk.CTkButton(control_frame, text="Redo", command=self.redo_combine)
+        self.redo_btn.grid(row=1, column=7, padx=10, pady=(5, 0))
+        self.redo_btn.configure(state="disabled")
+
+        # Save an in-progress cleanup and resume it on a later preview of the same data
+        ctk.CTkButton(control_frame, text="Save Session", command=self.save_session).grid(row=1, column=5, columnspan=2, pady=(5, 0))
+        ctk.CTkButton(control_frame, text="Load Session", command=self.load_session).grid(row=1, column=8, padx=10, pady=(5, 0))
+
+        # Near-duplicate company names found automatically, accepted in bulk
+        self.suggest_btn = ctk.CTkButton(control_frame, text="Suggest Merges", command=self.show_suggestions)
+        self.suggest_btn.grid(row=1, column=0, columnspan=3, pady=(5, 0))
+
+        ctk.CTkButton(control_frame, text="Add Group", command=self.queue_group).grid(row=1, column=3, padx=5, pady=(5, 0))
+        ctk.CTkButton(control_frame, text="Clear Groups", command=self.clear_queue).grid(row=1, column=4, padx=5, pady=(5, 0))
+
         self.protocol("WM_DELETE_WINDOW", self.on_close)  # intercept close window
 
         # Populate the treeview with data
         self.populate_treeview()
 
-    def populate_treeview(self):
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def load_frame(self, dataframe):
+        # Year-block layouts have (year, period) columns, shown as "YYYY-MM", "YYYY-Q1", ...
+        self.column_index = dataframe.columns
+        self.columns = ["-".join(map(str, c)) if isinstance(c, tuple) else str(c) for c in dataframe.columns]
+        self.names = RowOrder(dataframe.index)
+        # Rows are views into one int64 array; day-level layouts have hundreds of columns,
+        # too many to hold as Python lists
+        self.rows = dict(zip(self.names, dataframe.to_numpy(dtype="int64")))
+        # Each name's fixed slot in the original order; sorts use it to break ties
+        self.rank = self.names.slot_of
+        # Options the frame was built with (layout, tail, "Others" row) are handed back on save
+        self.attrs = dict(dataframe.attrs)
+        self.others_name = self.attrs.get("others")
+
+    def setup_columns(self):
+        # One Treeview column per period; sorting offers each of them
+        self.tree["columns"] = self.columns
+        for col in self.columns:
+            self.tree.column(col, width=60, minwidth=60, stretch=len(self.columns) <= 12, anchor="center")
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_heading(c))
+        self.sort_menu.configure(values=[SORT_ORIGINAL, "Name", "Total", *self.columns])
+        if self.sort_var.get() not in (SORT_ORIGINAL, "Name", "Total", *self.columns):
+            self.sort_var.set(SORT_ORIGINAL)
+
+    def set_grain(self, label):
+        # Same totals at another grain, laid out on a worker thread; the combines made here
+        # are replayed on the new rows once they arrive
+        grain = next(key for key, value in GRAINS.items() if value == label)
+        if grain == self.grain:
+            return
+        if self.jobs.busy:
+            self.grain_var.set(GRAINS[self.grain])
+            return
+        merges = list(self.folded_merges)
+
+        def job(report):
+            dataframe, folded = self.regrain(grain)
+            if folded is not None and merges:
+                folded = self.merged_frame(folded, merges)
+            return dataframe, folded, len(merges)
+
+        def on_error(e):
+            self.grain_var.set(GRAINS[self.grain])
+            messagebox.showerror("Error", f"Failed to change periods: {e}", parent=self)
+
+        self.grain_menu.configure(state="disabled")
+        self.row_count_label.configure(text=f"Laying out {label.lower()}...")
+        self.jobs.start(
+            job,
+            lambda result: self.load_grain(grain, *result),
+            on_error=on_error,
+            on_finish=lambda: self.grain_menu.configure(state="normal"),
+        )
+
+    def load_grain(self, grain, dataframe, folded, merged):
+        self.grain = grain
+        self.clear_source()
+        self.clear_target()
+        self.queued.clear()
+        self.show_queue()
+
+        self.load_frame(dataframe)
+        self.setup_columns()
+        self.journal.replay(self.names, self.rows)
+        # Merges made in the Others preview while the job ran
+        if folded is not None and len(self.folded_merges) > merged:
+            folded = self.merged_frame(folded, self.folded_merges[merged:])
+        self.folded = folded
+        self.show_others()
+
+        # Names and totals changed, so the search index and sort orders are rebuilt
+        self.name_index = None
+        self.orderings.clear()
+        self.relabel_others()
+        self.apply_filter()
+
+    @staticmethod
+    def frame_values(rows, names, columns):
+        return np.array([rows[name] for name in names], dtype="int64").reshape(len(names), len(columns))
+
+    @classmethod
+    def merged_frame(cls, dataframe, merges):
+        names = list(dataframe.index)
+        rows = dict(zip(names, dataframe.to_numpy(dtype="int64")))
+        combine_many(names, rows, merges)
+        values = cls.frame_values(rows, names, dataframe.columns)
+        return pd.DataFrame(values, index=pd.Index(names, name=dataframe.index.name), columns=dataframe.columns)
+
+    @property
+    def df(self):
+        values = self.frame_values(self.rows, self.names, self.columns)
+        df = pd.DataFrame(values, index=pd.Index(list(self.names), name=self.index_name), columns=self.column_index)
+        df.attrs.update(self.attrs, grain=self.grain)
+        return df
+
+    def visible_count(self):
+        # Header row takes one row height
+        height = self.tree.winfo_height()
+        if height <= 1:  # not mapped yet
+            height = 500
+        return max(1, height // self.row_height - 1)
+
+    def sort_key(self, key, name):
+        # Orderings sort on (value, original position), so equal values keep the original order
+        rank = self.rank[name]
+        if key == "Name":
+            return (str(name).casefold(), rank)
+        row = self.rows[name]
+        return (int(row.sum()) if key == "Total" else int(row[self.columns.index(key)]), rank)
+
+    def ordering(self, key):
+        # Names in ascending order of a sort key, with the sort keys alongside for bisect
+        if key not in self.orderings:
+            names = list(self.names)
+            if key == "Name":
+                keys = [self.sort_key(key, n) for n in names]
+                order = sorted(range(len(names)), key=keys.__getitem__)
+            else:
+                values = self.frame_values(self.rows, names, self.columns)
+                sort_values = values.sum(axis=1) if key == "Total" else values[:, self.columns.index(key)]
+                ranks = np.array([self.rank[n] for n in names], dtype="int64")
+                order = np.lexsort((ranks, sort_values)).tolist()
+                keys = list(zip(sort_values.tolist(), ranks.tolist()))
+            self.orderings[key] = ([names[i] for i in order], [keys[i] for i in order], dict(zip(names, keys)))
+        return self.orderings[key]
+
+    def refresh_view(self):
+        key = self.sort_var.get()
+        if key == SORT_ORIGINAL:
+            # The names are kept in their original order, so this view is the names themselves
+            order, key_of = self.names, self.rank
+        else:
+            order, _, key_of = self.ordering(key)
+
+        if self.filter_matches is None:
+            view = order
+        else:
+            # Matches still include names merged away since the index was built
+            matches = [name for name in self.filter_matches if name in self.rows]
+            view = sorted(matches, key=key_of.__getitem__)
+        # Descending views are read from the end instead of being copied reversed
+        self.view = view
+        self.view_descending = self.sort_descending_var.get() and key != SORT_ORIGINAL
+        self.populate_treeview()
+
+    def rows_changed(self, ops):
+        # Combines, undo and redo only touch their sources and targets, so each cached
+        # ordering is patched with a bisect per touched name instead of being sorted again
+        touched = dict.fromkeys(name for op in ops for name in (*op["sources"], *op["targets"]))
+        for key, (names, keys, key_of) in self.orderings.items():
+            for name in touched:
+                old = key_of.pop(name, None)
+                if old is not None:
+                    i = bisect.bisect_left(keys, old)
+                    del names[i], keys[i]
+                if name in self.rows:
+                    new = key_of[name] = self.sort_key(key, name)
+                    i = bisect.bisect_left(keys, new)
+                    names.insert(i, name)
+                    keys.insert(i, new)
+        self.refresh_view()
+
+    def apply_filter(self):
+        query = self.filter_var.get()
+        if query.strip() and self.name_index is None:
+            # Names merged away so far are indexed too, so undoing brings them back into results
+            self.name_index = NameIndex([*self.rows, *(source for source, _ in self.journal.merges())])
+        self.filter_matches = self.name_index.search(query) if self.name_index is not None else None
+        self.offset = 0
+        self.refresh_view()
+
+    def sort_by_heading(self, key):
+        # First click sorts names A-Z and numbers largest first; clicking again flips it
+        if self.sort_var.get() == key:
+            self.sort_descending_var.set(not self.sort_descending_var.get())
+        else:
+            self.sort_var.set(key)
+            self.sort_descending_var.set(key != "Name")
+        self.refresh_view()
 
-        month_cols = [f"{m:02d}" for m in range(1, 13)]
-        for name, row in self.df.iterrows():
-            values = [row.get(m, 0) for m in month_cols]
-            self.tree.insert("", "end", iid=name, text=name, values=values)
+    def populate_treeview(self):
+        count = self.visible_count()
+        self.offset = max(0, min(self.offset, len(self.view) - count))
+
+        # Grow or shrink the pool of slot items to the viewport size
+        slots = self.tree.get_children()
+        wanted = min(count, len(self.view))
+        for i in range(len(slots), wanted):
+            self.tree.insert("", "end", iid=f"slot{i}")
+        if len(slots) > wanted:
+            self.tree.delete(*slots[wanted:])
+
+        if self.view_descending:
+            end = len(self.view) - self.offset
+            self.slot_names = self.view[end - wanted:end][::-1]
+        else:
+            self.slot_names = self.view[self.offset:self.offset + wanted]
+        for i, name in enumerate(self.slot_names):
+            self.refresh_slot(i, name)
+
+        if self.view:
+            first = self.offset / len(self.view)
+            self.scrollbar.set(first, first + wanted / len(self.view))
+        else:
+            self.scrollbar.set(0, 1)
 
         # Update row count label
-        self.row_count_label.configure(text=f"Total Rows: {len(self.df)}")
+        if len(self.view) == len(self.names):
+            self.row_count_label.configure(text=f"Total Rows: {len(self.names)}")
+        else:
+            self.row_count_label.configure(text=f"Showing {len(self.view)} of {len(self.names)} rows")
+
+        # Update undo/redo button state
+        self.undo_btn.configure(state="normal" if self.journal.can_undo else "disabled")
+        self.redo_btn.configure(state="normal" if self.journal.can_redo else "disabled")
+
+    def refresh_slot(self, slot, name):
+        tags = ()
+        if name in self.source_names or name in self.queued:
+            tags = ("source",)
+        elif name == self.target_name or name in self.queued.values():
+            tags = ("target",)
+        # Values stay exact integers; rounding only happens for display
+        values = round_summary(self.rows[name]).tolist()
+        self.tree.item(f"slot{slot}", text=name, values=values, tags=tags)
+
+    def refresh_name(self, name):
+        # Targeted update of a single row if it is on screen
+        if name in self.slot_names:
+            self.refresh_slot(self.slot_names.index(name), name)
+
+    def on_resize(self, event):
+        self.populate_treeview()
 
-        # Update undo button state
-        self.undo_btn.configure(state="normal" if self.undo_stack else "disabled")
+    def on_scroll(self, action, amount, unit=None):
+        count = self.visible_count()
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.view))
+        elif unit == "pages":
+            self.offset += int(amount) * count
+        else:
+            self.offset += int(amount)
+        self.populate_treeview()
 
-    def on_row_click(self, event):
-        item_id = self.tree.identify_row(event.y)
+    def scroll_rows(self, delta):
+        self.offset += delta
+        self.populate_treeview()
+        return "break"
+
+    def on_mousewheel(self, event):
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self.scroll_rows(step * 3)
+
+    def name_at(self, y):
+        item_id = self.tree.identify_row(y)
         if not item_id:
+            return None
+        slot = int(item_id[len("slot"):])
+        return self.slot_names[slot] if slot < len(self.slot_names) else None
+
+    def on_row_click(self, event):
+        name = self.name_at(event.y)
+        if name is None or name == self.others_name:  # "Others" is not a company to merge
             return
 
-        if self.source_name is None:
-            self.source_name = item_id
-            self.source_entry.configure(state="normal")
-            self.source_entry.delete(0, "end")
-            self.source_entry.insert(0, self.source_name)
-            self.source_entry.configure(state="readonly")
-            self.highlight_row(self.source_name, "lightgreen")
-        elif self.target_name is None and item_id != self.source_name:
-            self.target_name = item_id
+        if event.state & 0x0004:  # Ctrl-click adds or removes another source
+            if name == self.target_name:
+                return
+            if name in self.source_names:
+                self.source_names.remove(name)
+            else:
+                self.source_names.append(name)
+            self.show_sources()
+            self.highlight_row(name, "lightgreen")
+        elif not self.source_names:
+            self.source_names = [name]
+            self.show_sources()
+            self.highlight_row(name, "lightgreen")
+        elif self.target_name is None and name not in self.source_names:
+            self.target_name = name
             self.target_entry.configure(state="normal")
             self.target_entry.delete(0, "end")
             self.target_entry.insert(0, self.target_name)
             self.target_entry.configure(state="readonly")
             self.highlight_row(self.target_name, "lightblue")
 
-    def highlight_row(self, row_id, color):
-        # Remove previous tags
-        for iid in self.tree.get_children():
-            self.tree.item(iid, tags=())
-        # Apply new tags
-        if color == "lightgreen":
-            self.tree.tag_configure("source", background=color)
-            self.tree.item(row_id, tags=("source",))
-        elif color == "lightblue":
-            self.tree.tag_configure("target", background=color)
-            self.tree.item(row_id, tags=("target",))
-
-    def clear_source(self):
-        if self.source_name:
-            self.tree.item(self.source_name, tags=())
-        self.source_name = None
+    def show_sources(self):
+        text = ""
+        if self.source_names:
+            text = str(self.source_names[0])
+            if len(self.source_names) > 1:
+                text += f" (+{len(self.source_names) - 1} more)"
         self.source_entry.configure(state="normal")
         self.source_entry.delete(0, "end")
+        self.source_entry.insert(0, text)
         self.source_entry.configure(state="readonly")
 
+    def highlight_row(self, row_id, color):
+        # Tags are derived from source/target while refreshing, so only this row needs updating
+        self.refresh_name(row_id)
+
+    def clear_source(self):
+        names, self.source_names = self.source_names, []
+        for name in names:
+            if name in self.rows:
+                self.refresh_name(name)
+        self.show_sources()
+
     def clear_target(self):
-        if self.target_name:
-            self.tree.item(self.target_name, tags=())
-        self.target_name = None
+        name, self.target_name = self.target_name, None
+        if name is not None and name in self.rows:
+            self.refresh_name(name)
         self.target_entry.configure(state="normal")
         self.target_entry.delete(0, "end")
         self.target_entry.configure(state="readonly")
 
-    def combine_rows(self):
-        if not self.source_name or not self.target_name:
-            messagebox.showerror("Selection Error", "Please select both source and target rows before combining.")
-            return
-        if self.source_name == self.target_name:
-            messagebox.showerror("Selection Error", "Source and target cannot be the same.")
-            return
-
-        # Save current df for undo
-        self.undo_stack.append(self.df.copy())
+    def show_queue(self):
+        groups = len(set(self.queued.values()))
+        self.combine_btn.configure(text=f"Combine (+{groups} queued)" if groups else "Combine")
 
-        # Combine rows by adding source row values to target row values
-        self.df.loc[self.target_name] = self.df.loc[self.target_name].add(self.df.loc[self.source_name], fill_value=0)
-
-        # Drop source row
-        self.df = self.df.drop(index=self.source_name)
+    def queue_group(self):
+        if not self.source_names or not self.target_name:
+            messagebox.showerror("Selection Error", "Please select both source and target rows before adding a group.")
+            return
+        self.queued.update((source, self.target_name) for source in self.source_names)
+        self.clear_source()
+        self.clear_target()
+        self.show_queue()
 
-        # Round up all values to 2 decimal places
-        self.df = np.ceil(self.df * 100) / 100
+    def clear_queue(self):
+        self.queued.clear()
+        self.show_queue()
+        self.populate_treeview()
 
-        # Clear selections and refresh UI
+    def combine_rows(self):
+        merges = list(self.queued.items())
+        if self.source_names or self.target_name or not merges:
+            if not self.source_names or not self.target_name:
+                messagebox.showerror("Selection Error", "Please select both source and target rows before combining.")
+                return
+            if self.target_name in self.source_names:
+                messagebox.showerror("Selection Error", "Source and target cannot be the same.")
+                return
+            merges += [(source, self.target_name) for source in self.source_names]
+
+        # Every queued group and the current selection are applied as one step
+        op = self.journal.combine_many(self.names, self.rows, merges)
+        self.queued.clear()
+        self.show_queue()
+
+        # Clear selections and refresh only the viewport
         self.clear_source()
         self.clear_target()
-        self.populate_treeview()
+        self.rows_changed([op] if op is not None else [])
 
     def undo_combine(self):
-        if not self.undo_stack:
+        op = self.journal.undo(self.names, self.rows)
+        if op is None:
             return
-        # Restore previous dataframe state
-        self.df = self.undo_stack.pop()
         # Clear selections
         self.clear_source()
         self.clear_target()
         # Refresh UI
-        self.populate_treeview()
+        self.rows_changed([op])
+
+    def redo_combine(self):
+        op = self.journal.redo(self.names, self.rows)
+        if op is None:
+            return
+        self.clear_source()
+        self.clear_target()
+        self.rows_changed([op])
+
+    def show_suggestions(self):
+        if self.jobs.busy:
+            return
+        # Names and totals are read here, on the GUI thread, before the worker starts.
+        # "Others" is not a company, so it is never offered as a merge
+        names = [name for name in self.names if name != self.others_name]
+        totals = [int(self.rows[name].sum()) for name in names]
+        self.suggest_btn.configure(state="disabled", text="Finding...")
+
+        def on_error(e):
+            messagebox.showerror("Error", f"Failed to find similar names: {e}", parent=self)
+
+        self.jobs.start(
+            lambda report: suggest_merges(names, totals),
+            self.on_suggestions,
+            on_error=on_error,
+            on_finish=lambda: self.suggest_btn.configure(state="normal", text="Suggest Merges"),
+        )
+
+    def on_suggestions(self, clusters):
+        if not clusters:
+            messagebox.showinfo("Suggest Merges", "No similar names found.", parent=self)
+            return
+        SuggestionsWindow(self, clusters, self.accept_suggestions)
+
+    def accept_suggestions(self, clusters):
+        # All accepted groups are merged in one step; rows already combined away are skipped
+        merges = [
+            (source, cluster["target"]) for cluster in clusters for source in cluster["sources"]
+            if self.others_name not in (source, cluster["target"])
+        ]
+        op = self.journal.combine_many(self.names, self.rows, merges)
+        self.clear_source()
+        self.clear_target()
+        self.rows_changed([op] if op is not None else [])
+
+    def save_session(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("Combine session", "*.json"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            self.journal.save(path, mode=self.mode)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save session: {e}", parent=self)
+
+    def load_session(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            filetypes=[("Combine session", "*.json"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            journal, mode = CombineJournal.load(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load session: {e}", parent=self)
+            return
+        if mode and mode != self.mode:
+            if not messagebox.askyesno("Load Session", f"This session was saved for {mode}. Load it anyway?", parent=self):
+                return
+
+        self.clear_source()
+        self.clear_target()
+
+        # Continue on top of the combines already made in this window
+        applied, skipped = journal.replay(self.names, self.rows)
+        self.journal.done.extend(journal.done)
+        self.journal.undone.clear()
+        self.rows_changed(journal.done)
+        if skipped:
+            messagebox.showwarning(
+                "Load Session",
+                f"Applied {applied} combines; {skipped} no longer match this preview and were skipped.",
+                parent=self,
+            )
+
+    def open_others(self):
+        PreviewWindow(self, f"{self.mode} - Others", self.folded, self.on_others_saved)
+
+    def on_others_saved(self, folded, merges, _folded=None):
+        # Merges among folded names leave the Others total unchanged, but not its name count
+        self.folded = folded
+        self.folded_merges.extend(merges)
+        self.show_others()
+        self.rows_changed(self.relabel_others())
+
+    def show_others(self):
+        if self.others_btn is not None:
+            count = len(self.folded) if self.folded is not None else 0
+            self.others_btn.configure(text=f"Open Others ({count:,})", state="normal" if count else "disabled")
+
+    def relabel_others(self):
+        # Renames the "Others" row after its folded names changed; returns the rename as an
+        # op for rows_changed so cached orderings are patched, or no ops when it is unchanged
+        old = self.others_name
+        if old is None or self.folded is None or old not in self.rows:
+            return []
+        new = others_label(len(self.folded))
+        if new == old:
+            return []
+        self.names.rename(old, new)
+        self.rows[new] = self.rows.pop(old)
+        self.others_name = self.attrs["others"] = new
+        if self.name_index is not None:
+            self.name_index = None  # rebuilt with the new name on the next keystroke
+            if self.filter_matches is not None and old in self.filter_matches:
+                self.filter_matches.add(new)
+        return [{"sources": [old], "targets": [new]}]
 
     def save_and_close(self):
         self.saved = True
-        self.on_combine_callback(self.df)
+        # Combines made here are also handed back so they can be remembered as aliases
+        merges = self.journal.merges() + self.folded_merges
+        if self.folded is not None:
+            self.on_combine_callback(self.df, merges, self.folded)
+        else:
+            self.on_combine_callback(self.df, merges)
         self.destroy()
 
     def on_close(self):
         if not self.saved:
             # Do not call callback on close without saving
-            self.destroy()
\ No newline at end of file
+            self.destroy()
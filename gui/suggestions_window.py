@@ -0,0 +1,55 @@
+import customtkinter as ctk
+from tkinter import ttk
+
+class SuggestionsWindow(ctk.CTkToplevel):
+    def __init__(self, parent, clusters, on_accept):
+        super().__init__(parent)
+        self.title("Suggested Merges")
+        self.geometry("800x450")
+        self.on_accept = on_accept
+        self.clusters = {}
+
+        ctk.CTkLabel(
+            self,
+            text=f"{len(clusters)} groups of similar names. Select groups to merge into the target on the left.",
+        ).pack(pady=(10, 5), padx=10, anchor="w")
+
+        tree_frame = ctk.CTkFrame(self, fg_color="transparent")
+        tree_frame.pack(fill="both", expand=True, padx=10)
+        self.tree = ttk.Treeview(tree_frame, columns=("sources", "score"), show="tree headings", selectmode="extended")
+        self.tree.heading("#0", text="Target")
+        self.tree.heading("sources", text="Will merge")
+        self.tree.heading("score", text="Similarity")
+        self.tree.column("#0", width=220, anchor="w")
+        self.tree.column("sources", width=460, anchor="w")
+        self.tree.column("score", width=80, anchor="center")
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        for i, cluster in enumerate(clusters):
+            iid = str(i)
+            self.clusters[iid] = cluster
+            sources = " | ".join(str(s) for s in cluster["sources"])
+            self.tree.insert("", "end", iid=iid, text=str(cluster["target"]), values=(sources, f"{cluster['score']:.2f}"))
+
+        button_frame = ctk.CTkFrame(self)
+        button_frame.pack(pady=10)
+        ctk.CTkButton(button_frame, text="Accept Selected", command=self.accept_selected).grid(row=0, column=0, padx=10)
+        ctk.CTkButton(button_frame, text="Accept All", command=self.accept_all).grid(row=0, column=1, padx=10)
+        ctk.CTkButton(button_frame, text="Close", command=self.destroy).grid(row=0, column=2, padx=10)
+
+        self.transient(parent)
+
+    def accept(self, iids):
+        if not iids:
+            return
+        self.on_accept([self.clusters.pop(iid) for iid in iids])
+        self.tree.delete(*iids)
+
+    def accept_selected(self):
+        self.accept(list(self.tree.selection()))
+
+    def accept_all(self):
+        self.accept(list(self.tree.get_children()))
@@ -0,0 +1,70 @@
+import json
+import os
+
+from logic.paths import app_data_path
+
+ALIAS_VERSION = 1
+
+
+def default_alias_path():
+    return app_data_path("aliases.json")
+
+
+class AliasMap:
+    # variant name -> canonical name, kept separately for each mode (Importer / Exporter)
+
+    def __init__(self, maps=None, path=None):
+        self.maps = {mode: dict(mapping) for mode, mapping in (maps or {}).items()}
+        self.path = path
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or default_alias_path()
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != ALIAS_VERSION:
+            raise ValueError(f"Unsupported alias file version: {data.get('version')}")
+        return cls(data.get("modes", {}), path=path)
+
+    def save(self, path=None):
+        path = path or self.path or default_alias_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": ALIAS_VERSION, "modes": self.maps}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def mapping(self, mode):
+        return dict(self.maps.get(mode, {}))
+
+    def __len__(self):
+        return sum(len(m) for m in self.maps.values())
+
+    def add(self, mode, variant, canonical):
+        # Keep the map flat: every variant points straight at its final canonical name
+        if not isinstance(variant, str) or not isinstance(canonical, str):
+            return False
+        mapping = self.maps.setdefault(mode, {})
+        canonical = mapping.get(canonical, canonical)
+        if canonical == variant:
+            mapping.pop(variant, None)
+            return False
+        mapping[variant] = canonical
+        for other, target in mapping.items():
+            if target == variant:
+                mapping[other] = canonical
+        return True
+
+    def clear(self):
+        removed = len(self)
+        self.maps = {}
+        return removed
+
+    def merge(self, other):
+        added = 0
+        for mode, mapping in other.maps.items():
+            for variant, canonical in mapping.items():
+                added += self.add(mode, variant, canonical)
+        return added
@@ -0,0 +1,198 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from logic.paths import app_data_path
+
+
+def default_log_path():
+    return app_data_path("logs", "runs.jsonl")
+
+
+def default_profile_path(name):
+    return app_data_path("profiles", f"{time.strftime('%Y%m%d-%H%M%S')}_{name}.prof")
+
+
+def current_rss_bytes():
+    # Resident memory of the process right now, or None where it cannot be read
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    counters = _windows_memory_counters() if sys.platform == "win32" else None
+    return counters.WorkingSetSize if counters is not None else None
+
+
+def peak_rss_bytes():
+    # High-water mark of the process's resident memory since it started, or None where it
+    # cannot be read. It never goes down, so it says nothing about a single stage or run.
+    try:
+        import resource
+    except ImportError:
+        counters = _windows_memory_counters()
+        return counters.PeakWorkingSetSize if counters is not None else None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _windows_memory_counters():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters
+    except Exception:
+        return None
+
+
+def _mb(size):
+    return round(size / 2**20, 1) if size is not None else None
+
+
+class RunTrace:
+    # Wall time, rows and resident memory (at the end and its change) per stage of one
+    # preview or export run
+    def __init__(self, name, context=None):
+        self.name = name
+        self.context = dict(context or {})
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages = []
+        self.status = "running"
+        self.started = time.time()
+        self.seconds = None
+        self.process_peak_rss_mb = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        # The yielded record can be updated inside the block, e.g. record["rows"] = len(df)
+        record = {"stage": name, "rows": rows}
+        start_rss = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            rss = current_rss_bytes()
+            record["rss_mb"] = _mb(rss)
+            record["rss_change_mb"] = _mb(rss - start_rss) if rss is not None and start_rss is not None else None
+            with self._lock:
+                self.stages.append(record)
+
+    def finish(self, status="ok"):
+        self.status = status
+        self.seconds = time.perf_counter() - self._start
+        self.process_peak_rss_mb = _mb(peak_rss_bytes())
+
+    @property
+    def rss_change_mb(self):
+        # Largest growth of resident memory over any one stage
+        changes = [s["rss_change_mb"] for s in self.stages if s["rss_change_mb"] is not None]
+        return max(changes) if changes else None
+
+    @property
+    def unparseable_dates(self):
+        # Each mode re-reads the same date column, so the largest count is the sheet's
+        counts = [s["unparseable"] for s in self.stages if s.get("unparseable") is not None]
+        return max(counts) if counts else None
+
+    def totals(self):
+        # Stages repeated per mode or metric are added up under one name, in first-seen order
+        totals = {}
+        for s in self.stages:
+            total = totals.setdefault(s["stage"], {"seconds": 0.0, "rows": None})
+            total["seconds"] += s["seconds"]
+            if s["rows"] is not None:
+                total["rows"] = (total["rows"] or 0) + s["rows"]
+        return totals
+
+    def summary(self):
+        parts = []
+        for stage, total in self.totals().items():
+            rows = f" ({total['rows']:,} rows)" if total["rows"] is not None else ""
+            parts.append(f"{stage} {total['seconds']:.2f}s{rows}")
+        if self.seconds is not None:
+            parts.append(f"total {self.seconds:.2f}s")
+        if self.rss_change_mb is not None:
+            parts.append(f"largest stage growth {self.rss_change_mb:+,.0f} MB")
+        if self.process_peak_rss_mb is not None:
+            parts.append(f"process peak so far {self.process_peak_rss_mb:,.0f} MB")
+        if self.unparseable_dates:
+            parts.append(f"{self.unparseable_dates:,} rows with unparseable dates left out")
+        return f"{self.name}: " + " · ".join(parts)
+
+    def records(self):
+        base = {"run_id": self.run_id, "run": self.name, **self.context}
+        for s in self.stages:
+            yield {**base, "event": "stage", **s}
+        yield {
+            **base,
+            "event": "run",
+            "status": self.status,
+            "started": self.started,
+            "seconds": self.seconds,
+            "rss_change_mb": self.rss_change_mb,
+            "process_peak_rss_mb": self.process_peak_rss_mb,
+            "unparseable_dates": self.unparseable_dates,
+        }
+
+    def write(self, path=None):
+        # Appends one JSON object per line, one per stage and one for the whole run
+        path = path or default_log_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+@contextmanager
+def traced(trace, name, rows=None):
+    # Stage hook that costs nothing when the caller passed no trace
+    if trace is None:
+        yield {}
+        return
+    with trace.stage(name, rows) as record:
+        yield record
+
+
+@contextmanager
+def profiled(path):
+    # cProfile of the calling thread, dumped in pstats format (snakeviz, pstats, gprof2dot)
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profiler.dump_stats(path)
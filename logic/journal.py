@@ -0,0 +1,251 @@
+import itertools
+import json
+
+import numpy as np
+
+JOURNAL_VERSION = 3
+
+
+class RowOrder:
+    # Names in display order for long-lived previews. Combines only remove names and undo
+    # puts them back where they were, so every name keeps a fixed slot and a Fenwick tree
+    # counts the slots still present: removing or restoring a name and finding the i-th
+    # one are O(log n), where a list shifts every later name. Supports the list operations
+    # the journal and the preview use.
+
+    def __init__(self, names):
+        self.slots = list(names)
+        self.slot_of = {name: i for i, name in enumerate(self.slots)}
+        self.present = bytearray(b"\x01") * len(self.slots)
+        self.count = len(self.slots)
+        # Every slot starts present, so node i (1-based) counts the lowbit(i) slots it covers
+        self.tree = [i & -i for i in range(len(self.slots) + 1)]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return itertools.compress(self.slots, self.present)
+
+    def __contains__(self, name):
+        slot = self.slot_of.get(name)
+        return slot is not None and bool(self.present[slot])
+
+    def _add(self, slot, delta):
+        self.present[slot] = delta > 0
+        self.count += delta
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _select(self, position):
+        # Slot of the name at this position among the present ones
+        slot, remaining = 0, position + 1
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            node = slot + step
+            if node < len(self.tree) and self.tree[node] < remaining:
+                slot, remaining = node, remaining - self.tree[node]
+            step >>= 1
+        return slot
+
+    def index(self, name):
+        if name not in self:
+            raise ValueError(f"{name!r} is not in the row order")
+        position, i = 0, self.slot_of[name]
+        while i:
+            position += self.tree[i]
+            i -= i & -i
+        return position
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.count)
+            if step != 1:
+                return list(self)[item]
+            names = []
+            if start >= stop:
+                return names
+            slot = self._select(start)
+            for _ in range(start, stop):
+                slot = self.present.find(1, slot)
+                names.append(self.slots[slot])
+                slot += 1
+            return names
+        position = item + self.count if item < 0 else item
+        if not 0 <= position < self.count:
+            raise IndexError("row order index out of range")
+        return self.slots[self._select(position)]
+
+    def __delitem__(self, position):
+        self._add(self._select(position), -1)
+
+    def insert(self, position, name):
+        # A name only ever comes back to its own slot, which is at this position again once
+        # the combines after it are undone
+        slot = self.slot_of[name]
+        if self.present[slot]:
+            raise ValueError(f"{name!r} is already in the row order")
+        self._add(slot, 1)
+
+    def rename(self, old, new):
+        slot = self.slot_of.pop(old)
+        self.slots[slot] = new
+        self.slot_of[new] = slot
+
+
+def _positions(names, sources):
+    # Ascending positions of the sources; a RowOrder finds each one without a scan
+    if isinstance(names, RowOrder):
+        return sorted(names.index(name) for name in sources)
+    return [i for i, name in enumerate(names) if name in sources]
+
+
+def resolve_merges(rows, merges):
+    # Map each source to the row it finally lands in, following chains (a -> b, b -> c).
+    # Merges whose source or final target is missing, or that loop back, are left out.
+    mapping = {source: target for source, target in merges if source != target and source in rows}
+    resolved = {}
+    for source, target in mapping.items():
+        seen = {source}
+        while target in mapping and target not in seen:
+            seen.add(target)
+            target = mapping[target]
+        if target in rows and target not in seen:
+            resolved[source] = target
+    return resolved
+
+
+def combine_many(names, rows, merges):
+    # Merge every (source, target) pair in place as one step and return the operation that
+    # records it, or None when nothing applies. Rows hold exact fixed-point integers, so each
+    # target's delta is exactly the sum of its sources.
+    resolved = resolve_merges(rows, merges)
+    if not resolved:
+        return None
+    positions = _positions(names, resolved)
+    sources = [names[i] for i in positions]
+    op = {
+        "sources": sources,
+        "targets": [resolved[source] for source in sources],
+        "positions": positions,
+        "source_values": [rows[source] for source in sources],
+    }
+    apply_op(names, rows, op)
+    return op
+
+
+def combine(names, rows, source, target):
+    return combine_many(names, rows, [(source, target)])
+
+
+def op_merges(op):
+    return list(zip(op["sources"], op["targets"]))
+
+
+def _add_to_targets(rows, op, sign):
+    # Grouped sum of the source rows by target, added to (or taken from) each target once
+    targets = list(dict.fromkeys(op["targets"]))
+    group = {target: i for i, target in enumerate(targets)}
+    values = np.array(op["source_values"])
+    sums = np.zeros((len(targets), values.shape[1]), dtype=values.dtype)
+    np.add.at(sums, [group[target] for target in op["targets"]], values)
+    for target, delta in zip(targets, sums):
+        rows[target] = rows[target] + sign * delta
+
+
+def apply_op(names, rows, op):
+    # Positions are ascending, so deleting from the last one keeps the others valid
+    for position in reversed(op["positions"]):
+        del names[position]
+    for source in op["sources"]:
+        del rows[source]
+    _add_to_targets(rows, op, 1)
+
+
+def revert_op(names, rows, op):
+    # Sources go back to their recorded positions, first one first
+    for position, source in zip(op["positions"], op["sources"]):
+        names.insert(position, source)
+    for source, values in zip(op["sources"], op["source_values"]):
+        rows[source] = np.array(values, dtype="int64")
+    _add_to_targets(rows, op, -1)
+
+
+class CombineJournal:
+    def __init__(self, ops=None):
+        self.done = list(ops or [])
+        self.undone = []
+
+    @property
+    def can_undo(self):
+        return bool(self.done)
+
+    @property
+    def can_redo(self):
+        return bool(self.undone)
+
+    def merges(self):
+        return [merge for op in self.done for merge in op_merges(op)]
+
+    def combine(self, names, rows, source, target):
+        return self.combine_many(names, rows, [(source, target)])
+
+    def combine_many(self, names, rows, merges):
+        # However many rows are merged, the batch is one undoable step
+        op = combine_many(names, rows, merges)
+        if op is not None:
+            self.done.append(op)
+            self.undone.clear()
+        return op
+
+    def undo(self, names, rows):
+        if not self.done:
+            return None
+        op = self.done.pop()
+        revert_op(names, rows, op)
+        self.undone.append(op)
+        return op
+
+    def redo(self, names, rows):
+        if not self.undone:
+            return None
+        op = self.undone.pop()
+        apply_op(names, rows, op)
+        self.done.append(op)
+        return op
+
+    def replay(self, names, rows):
+        # Re-apply a loaded session on a fresh preview, skipping combines whose rows no longer exist
+        ops = []
+        applied = skipped = 0
+        for op in self.done:
+            merges = op_merges(op)
+            new_op = combine_many(names, rows, merges)
+            count = len(new_op["sources"]) if new_op is not None else 0
+            applied += count
+            skipped += len(merges) - count
+            if new_op is not None:
+                ops.append(new_op)
+        self.done = ops
+        self.undone = []
+        return applied, skipped
+
+    def to_dict(self, mode=None):
+        # Source rows are numpy arrays in memory and plain lists in a saved session
+        ops = [{**op, "source_values": np.asarray(op["source_values"], dtype="int64").tolist()} for op in self.done]
+        return {"version": JOURNAL_VERSION, "mode": mode, "ops": ops}
+
+    def save(self, path, mode=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(mode), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.get("version")
+        if version != JOURNAL_VERSION:
+            raise ValueError(f"Unsupported journal version: {version}")
+        return cls(data["ops"]), data.get("mode")
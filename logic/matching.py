@@ -0,0 +1,151 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Legal-form words are dropped from the matching key ("ABC CO LTD" -> "ABC")
+LEGAL_FORMS = {
+    "CO", "COMPANY", "CORP", "CORPORATION", "LTD", "LIMITED", "INC", "INCORPORATED",
+    "LLC", "PLC", "PCL", "PUBLIC", "PTE", "PVT", "PRIVATE", "GMBH", "SA", "BV", "AG",
+    "SRL", "SDN", "BHD", "THE",
+}
+NGRAM = 3
+PREFIX_OVERLAP = 2  # prefix grams two similar keys must share before they are compared
+
+_NON_WORD = re.compile(r"[^0-9A-Z]+")
+
+
+def normalize_name(name):
+    # "A.B.C. COMPANY LIMITED", "ABC CO., LTD" and "abc co ltd" all normalize to "ABC"
+    text = str(name).upper().replace("&", " AND ")
+    text = text.replace(".", "")
+    tokens = _NON_WORD.sub(" ", text).split()
+    core = [t for t in tokens if t not in LEGAL_FORMS]
+    return " ".join(core or tokens)
+
+
+def name_ngrams(key, n=NGRAM):
+    padded = f" {key} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def _at_least(x):
+    # Smallest whole number of grams >= x, tolerant of float error (0.8 * 15 -> 12, not 13)
+    return math.ceil(x - 1e-9)
+
+
+def similar_pairs(keys, threshold=0.8):
+    # All pairs of keys whose n-gram Jaccard similarity is >= threshold, without comparing
+    # every pair. Grams are ranked rarest-first; two keys that similar share at least
+    # PREFIX_OVERLAP grams within short prefixes of their ranked grams (prefix filtering),
+    # so only those prefixes are indexed and only keys sharing enough of them are compared
+    # in full. Keys are visited shortest first, so each posting list is skipped up to the
+    # first key long enough to match (length filtering).
+    gram_sets = [name_ngrams(k) for k in keys]
+    sizes = [len(grams) for grams in gram_sets]
+    frequency = Counter(g for grams in gram_sets for g in grams)
+    rank = {g: r for r, g in enumerate(sorted(frequency, key=lambda g: (frequency[g], g)))}
+    ordered = [sorted(rank[g] for g in grams) for grams in gram_sets]
+
+    # Ranked grams of every key back to back, for comparing many candidates at once
+    flat = np.fromiter((g for tokens in ordered for g in tokens), dtype="int64")
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype("int64")
+    size_array = np.asarray(sizes, dtype="int64")
+    member = np.zeros(len(rank), dtype=bool)
+
+    ratio = threshold / (1 + threshold)  # overlap needed, as a share of both sizes together
+    index = defaultdict(list)  # gram rank -> keys with it in their indexing prefix, shortest first
+    start = defaultdict(int)   # gram rank -> first key in its postings long enough for the current key
+    pairs = []
+    for i in sorted(range(len(keys)), key=sizes.__getitem__):
+        tokens = ordered[i]
+        size = sizes[i]
+        min_size = threshold * size
+        # A similar shorter key y needs an overlap of at least t * size here and
+        # 2t / (1 + t) * |y| on its own side, which fixes how long each prefix must be
+        probe = min(size, size - _at_least(threshold * size) + PREFIX_OVERLAP)
+        indexed = min(size, size - _at_least(2 * ratio * size) + PREFIX_OVERLAP)
+        # Keys too short to need two shared grams only have to share one
+        needed = PREFIX_OVERLAP if ratio * (size + min_size) > PREFIX_OVERLAP - 1 else 1
+
+        shared = Counter()
+        for g in tokens[:probe]:
+            postings = index[g]
+            first = start[g]
+            while first < len(postings) and sizes[postings[first]] < min_size:
+                first += 1
+            start[g] = first
+            shared.update(postings[first:])
+        for g in tokens[:indexed]:
+            index[g].append(i)
+        if not shared:
+            continue
+
+        # Candidates are verified together: each one's grams are looked up in this key's
+        candidates = np.fromiter(shared.keys(), dtype="int64", count=len(shared))
+        counts = np.fromiter(shared.values(), dtype="int64", count=len(shared))
+        candidates = candidates[counts >= needed]
+        if not len(candidates):
+            continue
+        lengths = size_array[candidates]
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1]) + np.repeat(offsets[candidates] - (ends - lengths), lengths)
+        member[tokens] = True
+        common = np.add.reduceat(member[flat[positions]], ends - lengths)
+        member[tokens] = False
+        scores = common / (size + lengths - common)
+        for j, score in zip(candidates[scores >= threshold].tolist(), scores[scores >= threshold].tolist()):
+            pairs.append((j, i, score))
+    return pairs
+
+
+def suggest_merges(names, totals=None, threshold=0.8):
+    # Group names that look like the same company; returns clusters ranked by volume (or size)
+    names = list(names)
+    keys = [normalize_name(n) for n in names]
+
+    # Names with identical keys are merged outright; only distinct keys are fuzzy-matched
+    by_key = defaultdict(list)
+    for i, key in enumerate(keys):
+        by_key[key].append(i)
+    unique_keys = list(by_key)
+
+    parent = list(range(len(unique_keys)))
+    best = [1.0] * len(unique_keys)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, score in similar_pairs(unique_keys, threshold):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+            best[ra] = min(best[ra], best[rb], score)
+
+    groups = defaultdict(list)
+    for k, key in enumerate(unique_keys):
+        groups[find(k)].extend(by_key[key])
+
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        weights = [totals[i] if totals is not None else 0 for i in members]
+        # The biggest name (or the first one) becomes the target
+        target_pos = max(range(len(members)), key=lambda p: (weights[p], -p))
+        target = members[target_pos]
+        clusters.append({
+            "target": names[target],
+            "sources": [names[i] for i in members if i != target],
+            "score": best[root],
+            "total": sum(weights),
+        })
+
+    clusters.sort(key=lambda c: (c["total"], len(c["sources"]), c["score"]), reverse=True)
+    return clusters
@@ -0,0 +1,44 @@
+# Choices offered by the app and the CLI; kept light so the window can open before pandas loads
+MODES = ("Importer", "Exporter")
+TYPES = ("Weight", "Quantity")
+
+# Month layouts a (name, year, month) cube can be laid out in
+LAYOUTS = {
+    "combined": "12 months (years combined)",
+    "per_year": "One block per year",
+    "rolling_12": "Rolling 12 months",
+    "rolling_24": "Rolling 24 months",
+}
+
+# Period grains summaries can be rolled up to from the day-level totals
+GRAINS = {
+    "month": "Months",
+    "quarter": "Quarters",
+    "week": "ISO weeks",
+    "day": "Days",
+}
+
+# Long-tail compaction: keep the largest names ("top_N" by total, or "share_P" for the
+# fewest names making up P% of the total) and fold the rest into one Others row
+TAILS = {
+    "all": "All names",
+    "top_100": "Top 100 names + Others",
+    "top_1000": "Top 1,000 names + Others",
+    "share_99": "Names up to 99% of total + Others",
+    "share_95": "Names up to 95% of total + Others",
+}
+
+
+def parse_tail(tail):
+    # "top_500" -> ("top", 500), "share_99.5" -> ("share", 99.5), "all" or None -> None
+    if tail in (None, "all"):
+        return None
+    kind, _, amount = tail.partition("_")
+    try:
+        if kind == "top" and int(amount) > 0:
+            return kind, int(amount)
+        if kind == "share" and 0 < float(amount) <= 100:
+            return kind, float(amount)
+    except ValueError:
+        pass
+    raise ValueError(f"Unknown tail option '{tail}' (expected all, top_N or share_P)")
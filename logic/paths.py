@@ -0,0 +1,40 @@
+import os
+import re
+
+# App data and file-name helpers; kept free of pandas/openpyxl so the window can open
+# before the heavy modules are loaded
+
+# Per-user state (alias maps, caches, logs) lives under ~/.monthly_summary
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".monthly_summary")
+
+def app_data_path(*parts):
+    return os.path.join(APP_DATA_DIR, *parts)
+
+def extract_sheet_name_from_filename(filename):
+    base = os.path.splitext(os.path.basename(filename))[0]
+    match = re.match(r"([A-Za-z]+)(\d{4})", base)
+    if match:
+        return f"{match.group(1)}_{match.group(2)}"
+    return None
+
+def split_sheet_name(sheet_name):
+    # "TH_2023" -> ("TH", 2023); the year is None when the sheet name has none
+    match = re.match(r"([A-Za-z]+)_?(\d{4})?", sheet_name or "")
+    if not match:
+        return None, None
+    return match.group(1).upper(), int(match.group(2)) if match.group(2) else None
+
+def generate_suggested_output_filename(filename, selected_modes):
+    base = os.path.splitext(os.path.basename(filename))[0]
+    match = re.match(r"([A-Za-z]+\d{4})", base)
+    if match:
+        base = match.group(1)
+
+    suffix_parts = []
+    if "Importer" in selected_modes:
+        suffix_parts.append("im")
+    if "Exporter" in selected_modes:
+        suffix_parts.append("ex")
+
+    suffix = "_" + "_".join(suffix_parts) + "_per_month"
+    return base + suffix + ".xlsx"
@@ -0,0 +1,93 @@
+from logic.summarizer import summarize_days, period_layout, round_summary, compact_tail, NAME_COLUMNS, VALUE_COLUMNS
+from logic.streaming import stream_days
+from logic.sheet_cache import load_used_columns
+from logic.instrument import traced
+from logic.utils import write_summary_workbook
+from logic.options import TYPES
+
+
+def _no_progress(stage, fraction=None):
+    pass
+
+
+def summarize_modes_days(input_path, sheet_name, modes, types=TYPES, streaming=False, sheet_cache=None, progress=None, aliases=None, sidecar=None, trace=None):
+    # Day-level totals of each mode (mode -> DayCube keyed by value column), from one read of
+    # the sheet however many modes are asked for; any grain and layout derives from them.
+    # aliases: mode -> variant map
+    progress = progress or _no_progress
+    aliases = aliases or {}
+    value_col_indices = [VALUE_COLUMNS[t] for t in types]
+    if streaming:
+        progress(f"Streaming {sheet_name} ({', '.join(modes)})")
+        days = stream_days(
+            input_path, sheet_name, [NAME_COLUMNS[m] for m in modes], value_col_indices,
+            progress=progress, aliases=[aliases.get(m) for m in modes], trace=trace,
+        )
+        return dict(zip(modes, days))
+
+    progress(f"Reading {sheet_name}")
+    with traced(trace, "read") as record:
+        if sheet_cache is not None:
+            df = sheet_cache.load(input_path, sheet_name)
+        else:
+            df = load_used_columns(input_path, sheet_name, sidecar)
+        record["rows"] = len(df)
+    result = {}
+    for mode in modes:
+        progress(f"Summarizing {mode}")
+        result[mode] = summarize_days(df, NAME_COLUMNS[mode], value_col_indices, aliases=aliases.get(mode), trace=trace)
+    return result
+
+
+def summarize_mode_days(input_path, sheet_name, mode, types=TYPES, streaming=False, sheet_cache=None, progress=None, aliases=None, sidecar=None, trace=None):
+    return summarize_modes_days(input_path, sheet_name, [mode], types, streaming, sheet_cache, progress, {mode: aliases}, sidecar, trace)[mode]
+
+
+def mode_layout(days, types=TYPES, layout="combined", grain="month", aliases=None, trace=None):
+    with traced(trace, "layout"):
+        return {t: period_layout(days.cube(VALUE_COLUMNS[t], grain, aliases), layout, grain) for t in types}
+
+
+def export_summary(input_path, output_path, sheet_name, modes, streaming=False, sheet_cache=None, progress=None, alias_map=None, layout="combined", sidecar=None, trace=None, tail=None, grain="month"):
+    progress = progress or _no_progress
+    aliases = {mode: alias_map.mapping(mode) for mode in modes} if alias_map is not None else None
+    days = summarize_modes_days(
+        input_path, sheet_name, modes,
+        streaming=streaming, sheet_cache=sheet_cache, progress=progress, aliases=aliases, sidecar=sidecar, trace=trace,
+    )
+    sheets = []
+    for i, mode in enumerate(modes):
+        progress(f"Laying out {mode}", (i + 1) / (len(modes) + 2))
+        summaries = mode_layout(days[mode], layout=layout, grain=grain, trace=trace)
+        for type_ in TYPES:
+            sheets.append((f"{mode.lower()}_{type_.lower()}", mode, type_, export_frame(summaries[type_], tail, trace)))
+    progress("Writing output", (len(modes) + 1) / (len(modes) + 2))
+    write_output(output_path, sheets, trace)
+    return output_path
+
+
+def export_frame(summary, tail=None, trace=None):
+    # Long tails are folded before rounding, so writing and formatting scale with the kept rows
+    with traced(trace, "compact", len(summary)):
+        summary, _ = compact_tail(summary, tail)
+    return round_summary(summary)
+
+
+def write_output(output_path, sheets, trace=None):
+    with traced(trace, "write", sum(len(df) for *_, df in sheets)):
+        write_summary_workbook(output_path, sheets)
+
+
+def export_store_summary(store, output_path, country, modes, years=None, progress=None, alias_map=None, layout="combined", tail=None):
+    # Same workbook as export_summary, built from the aggregate store instead of the workbooks
+    progress = progress or _no_progress
+    sheets = []
+    for i, mode in enumerate(modes):
+        progress(f"Reading {mode} totals from the store", i / (len(modes) + 1))
+        aliases = alias_map.mapping(mode) if alias_map is not None else None
+        summaries = store.summarize(country, mode, TYPES, years=years, aliases=aliases, layout=layout)
+        for type_ in TYPES:
+            sheets.append((f"{mode.lower()}_{type_.lower()}", mode, type_, export_frame(summaries[type_], tail)))
+    progress("Writing output", len(modes) / (len(modes) + 1))
+    write_summary_workbook(output_path, sheets)
+    return output_path
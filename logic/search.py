@@ -0,0 +1,52 @@
+from collections import defaultdict
+
+from logic.matching import NGRAM, name_ngrams
+
+
+def search_key(name):
+    # Case- and spacing-insensitive form the type-ahead filter matches against
+    return " ".join(str(name).casefold().split())
+
+
+class NameIndex:
+    # Trigram postings over the preview's names. A query's candidates are the names that
+    # contain every trigram of the query, so a keystroke only verifies a short list instead
+    # of scanning every name; a query that extends the previous one only re-checks its hits.
+    # Combines never create names, so the index is built once and callers drop names that
+    # are currently merged away.
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.keys = [search_key(n) for n in self.names]
+        self.postings = defaultdict(list)  # gram -> ids of names containing it, ascending
+        for i, key in enumerate(self.keys):
+            for gram in name_ngrams(key):
+                self.postings[gram].append(i)
+        self._last_query = None
+        self._last_ids = None
+
+    def _candidates(self, query):
+        if self._last_query and self._last_query in query:
+            return self._last_ids
+        if len(query) < NGRAM:
+            return range(len(self.keys))
+        grams = sorted(
+            {query[i:i + NGRAM] for i in range(len(query) - NGRAM + 1)},
+            key=lambda g: len(self.postings.get(g, ())),
+        )
+        ids = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not ids:
+                break
+            ids.intersection_update(self.postings.get(gram, ()))
+        return ids
+
+    def search(self, query):
+        # Names containing the query, or None when the query is empty (no filter)
+        query = search_key(query)
+        if not query:
+            self._last_query = self._last_ids = None
+            return None
+        ids = [i for i in self._candidates(query) if query in self.keys[i]]
+        self._last_query, self._last_ids = query, ids
+        return {self.names[i] for i in ids}
@@ -0,0 +1,84 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from logic.sidecar import normalize_used_columns
+from logic.summarizer import USED_COLUMNS
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+
+def sheet_key(path, sheet_name):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, sheet_name)
+
+
+def read_used_columns(path, sheet_name):
+    # Only parse columns B, E, I, W, Y; the summarizer maps them back by their sheet position
+    df = pd.read_excel(path, sheet_name=sheet_name, usecols=USED_COLUMNS)
+    df.attrs["source_columns"] = list(USED_COLUMNS)
+    return df
+
+
+def load_used_columns(path, sheet_name, sidecar=None):
+    # Parse the workbook only when there is no up-to-date columnar sidecar for the sheet
+    if sidecar is None:
+        return read_used_columns(path, sheet_name)
+    df = sidecar.load(path, sheet_name)
+    if df is None:
+        df = normalize_used_columns(read_used_columns(path, sheet_name))
+        try:
+            sidecar.store(path, sheet_name, df)
+        except OSError:
+            pass  # a read-only cache directory only costs the speed-up
+    return df
+
+
+class SheetCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, sidecar=None):
+        self.max_bytes = max_bytes
+        self.sidecar = sidecar
+        self._entries = OrderedDict()  # key -> (df, nbytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self, path, sheet_name):
+        key = sheet_key(path, sheet_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        df = load_used_columns(path, sheet_name, self.sidecar)
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+
+        with self._lock:
+            self._drop_stale(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (df, nbytes)
+                self._total_bytes += nbytes
+                self._evict()
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _drop_stale(self, key):
+        # Older versions of the same (path, sheet) can never be hit again
+        path, _, _, sheet_name = key
+        for other in list(self._entries):
+            if other[0] == path and other[3] == sheet_name:
+                self._remove(other)
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, nbytes = self._entries.pop(key)
+        self._total_bytes -= nbytes
@@ -0,0 +1,160 @@
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from logic.summarizer import DATE_ERROR_COLUMN, USED_COLUMNS, parse_dates, text_names
+from logic.paths import app_data_path
+
+SIDECAR_VERSION = 4
+SIDECAR_COLUMNS = ["date", "exporter", "importer", "quantity", "weight"]  # sheet columns B, E, I, W, Y
+
+try:
+    import pyarrow  # noqa: F401  (Feather support for pandas)
+    SIDECAR_FORMAT = "feather"
+except ImportError:
+    SIDECAR_FORMAT = "pickle"
+
+
+def default_cache_dir():
+    return app_data_path("cache")
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_used_columns(df):
+    # Give the five used columns stable names and columnar-friendly types. Dates are parsed
+    # and values coerced exactly as the summarizer would, so summaries are unchanged; the
+    # text of date cells that failed to parse is kept for the unparseable-date count.
+    # Names become text with the summarizer's own text_names, which every read path applies.
+    dates = parse_dates(df.iloc[:, 0])
+    failed = dates.isna() & df.iloc[:, 0].notna()
+    normalized = pd.DataFrame({
+        "date": dates,
+        "exporter": text_names(df.iloc[:, 1]).astype(object),
+        "importer": text_names(df.iloc[:, 2]).astype(object),
+        "quantity": pd.to_numeric(df.iloc[:, 3], errors="coerce"),
+        "weight": pd.to_numeric(df.iloc[:, 4], errors="coerce"),
+        DATE_ERROR_COLUMN: text_names(df.iloc[:, 0].where(failed)).astype(object),
+    })
+    normalized.attrs["source_columns"] = list(USED_COLUMNS)
+    return normalized
+
+
+class SidecarCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+
+    def _base(self, path, sheet_name):
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{sheet_name}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def _data_path(self, base, fmt):
+        return f"{base}.{fmt}"
+
+    def load(self, path, sheet_name):
+        base = self._base(path, sheet_name)
+        meta = self._read_meta(base + ".json")
+        if meta is None or not self._is_fresh(meta, path):
+            return None
+        try:
+            data_path = self._data_path(base, meta["format"])
+            if meta["format"] == "feather":
+                df = pd.read_feather(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+        except Exception:
+            self.remove(base)
+            return None
+        df.attrs["source_columns"] = list(USED_COLUMNS)
+        return df
+
+    def store(self, path, sheet_name, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        base = self._base(path, sheet_name)
+        stat = os.stat(path)
+        data_path = self._data_path(base, SIDECAR_FORMAT)
+        tmp_path = data_path + ".tmp"
+        if SIDECAR_FORMAT == "feather":
+            df.reset_index(drop=True).to_feather(tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, data_path)
+
+        meta = {
+            "version": SIDECAR_VERSION,
+            "format": SIDECAR_FORMAT,
+            "source": os.path.abspath(path),
+            "sheet": sheet_name,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": file_sha256(path),
+            "rows": len(df),
+            "created": time.time(),
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == SIDECAR_VERSION else None
+
+    def _is_fresh(self, meta, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != meta["size"]:
+            return False
+        if stat.st_mtime_ns == meta["mtime_ns"]:
+            return True
+        # Same size but touched or copied: only the content hash can tell
+        return file_sha256(path) == meta["sha256"]
+
+    def entries(self):
+        result = []
+        for meta_path in sorted(glob.glob(os.path.join(self.cache_dir, "*.json"))):
+            meta = self._read_meta(meta_path)
+            base = meta_path[:-len(".json")]
+            if meta is None:
+                result.append({"base": base, "status": "invalid"})
+                continue
+            data_path = self._data_path(base, meta["format"])
+            if not os.path.exists(meta["source"]):
+                status = "source missing"
+            elif not self._is_fresh(meta, meta["source"]):
+                status = "stale"
+            else:
+                status = "valid"
+            size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+            result.append({**meta, "base": base, "status": status, "bytes": size})
+        return result
+
+    def remove(self, base):
+        for suffix in (".json", ".feather", ".pickle"):
+            try:
+                os.remove(base + suffix)
+            except FileNotFoundError:
+                pass
+
+    def purge(self, stale_only=False):
+        removed = 0
+        for entry in self.entries():
+            if stale_only and entry["status"] == "valid":
+                continue
+            self.remove(entry["base"])
+            removed += 1
+        return removed
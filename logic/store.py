@@ -0,0 +1,264 @@
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from logic.sheet_cache import load_used_columns
+from logic.sidecar import file_sha256
+from logic.summarizer import (
+    NAME_COLUMNS, VALUE_COLUMNS, apply_aliases, build_cube_frame, month_layout, summarize_cube,
+)
+from logic.paths import app_data_path, split_sheet_name
+
+STORE_VERSION = 1
+
+# sources: one row per loaded workbook sheet, identified by its content hash
+# contributions: each source's own totals, kept so a newer version of a workbook can replace it
+# aggregates: running totals over all sources, keyed by (country, mode, metric, name, year-month)
+# source_names: every name seen per source, so names whose totals are all zero still get a row
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    country TEXT NOT NULL,
+    year INTEGER,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at REAL NOT NULL,
+    UNIQUE (sha256, sheet)
+);
+CREATE TABLE IF NOT EXISTS contributions (
+    source_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    name TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (source_id, mode, metric, name, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS source_names (
+    source_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (source_id, mode, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aggregates (
+    country TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    name TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (country, mode, metric, name, period)
+) WITHOUT ROWID;
+"""
+
+# Empty name cells are stored as '' (SQLite key columns cannot hold NULL reliably)
+MISSING_NAME = ""
+
+
+def default_store_path():
+    return app_data_path("aggregates.sqlite3")
+
+
+def _store_name(name):
+    if isinstance(name, str):
+        return name
+    return MISSING_NAME if pd.isna(name) else str(name)
+
+
+def _cube_records(cube, mode, metric):
+    # Only non-zero cells are stored; zeros are the fill value when a cube is rebuilt
+    totals = {}
+    values = cube.to_numpy()
+    rows, cols = np.nonzero(values)
+    periods = cube.columns.to_numpy()
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        key = (mode, metric, _store_name(cube.index[r]), int(periods[c]))
+        totals[key] = totals.get(key, 0) + int(values[r, c])
+    return totals
+
+
+class AggregateStore:
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(STORE_VERSION),))
+            elif int(row[0]) != STORE_VERSION:
+                raise ValueError(f"Unsupported store version: {row[0]}")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call, so the store can be used from worker threads
+        with closing(sqlite3.connect(self.path)) as conn:
+            with conn:
+                yield conn
+
+    def sources(self):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(r) for r in conn.execute("SELECT * FROM sources ORDER BY country, year, file_name")]
+
+    def recorded_source(self, path, sheet_name):
+        # The stored source of this file and sheet when it is still current: same size and
+        # mtime, or the file is gone and only its stored totals remain. None otherwise.
+        abs_path = os.path.abspath(path)
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            source = conn.execute("SELECT * FROM sources WHERE path = ? AND sheet = ?", (abs_path, sheet_name)).fetchone()
+        if source is None:
+            return None
+        try:
+            stat = os.stat(abs_path)
+        except FileNotFoundError:
+            return dict(source)
+        if (source["size"], source["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return dict(source)
+        return None
+
+    def load_file(self, path, sheet_name, progress=None, sidecar=None):
+        # Merge one workbook sheet into the store. Returns (status, source) where status is
+        # 'unchanged' (same file already loaded), 'duplicate' (same content loaded from
+        # elsewhere), 'replaced' (a new version of a loaded workbook) or 'loaded'.
+        country, year = split_sheet_name(sheet_name)
+        if country is None:
+            raise ValueError(f"Cannot infer the country from sheet name '{sheet_name}'")
+        same_file = self.recorded_source(path, sheet_name)
+        if same_file is not None:
+            return "unchanged", same_file
+        abs_path = os.path.abspath(path)
+        file_name = os.path.basename(abs_path)
+        stat = os.stat(abs_path)
+
+        if progress is not None:
+            progress(f"Hashing {file_name}")
+        sha256 = file_sha256(abs_path)
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            duplicate = conn.execute(
+                "SELECT * FROM sources WHERE sha256 = ? AND sheet = ?", (sha256, sheet_name)
+            ).fetchone()
+            if duplicate is not None:
+                if duplicate["path"] == abs_path:  # touched but not modified
+                    conn.execute("UPDATE sources SET mtime_ns = ? WHERE id = ?", (stat.st_mtime_ns, duplicate["id"]))
+                return "duplicate", dict(duplicate)
+
+        if progress is not None:
+            progress(f"Reading {sheet_name}")
+        df = load_used_columns(abs_path, sheet_name, sidecar)
+        contributions = {}
+        names = {}
+        for mode, name_col in NAME_COLUMNS.items():
+            if progress is not None:
+                progress(f"Summarizing {mode}")
+            cubes = summarize_cube(df, name_col, list(VALUE_COLUMNS.values()))
+            for metric, value_col in VALUE_COLUMNS.items():
+                contributions.update(_cube_records(cubes[value_col], mode, metric))
+            names[mode] = {_store_name(n) for n in cubes[value_col].index}
+
+        if progress is not None:
+            progress("Updating the aggregate store")
+        with self._connect() as conn:
+            # A workbook with the same file and sheet name is an older version of this one
+            previous = conn.execute(
+                "SELECT id FROM sources WHERE country = ? AND file_name = ? AND sheet = ?",
+                (country, file_name, sheet_name),
+            ).fetchall()
+            for (source_id,) in previous:
+                self._remove_source(conn, source_id)
+
+            cursor = conn.execute(
+                "INSERT INTO sources (sha256, path, file_name, sheet, country, year, size, mtime_ns, rows, loaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha256, abs_path, file_name, sheet_name, country, year, stat.st_size, stat.st_mtime_ns, len(df), time.time()),
+            )
+            source_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO contributions VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_id, *key, total) for key, total in contributions.items()],
+            )
+            conn.executemany(
+                "INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (country, mode, metric, name, period) DO UPDATE SET total = total + excluded.total",
+                [(country, *key, total) for key, total in contributions.items()],
+            )
+            conn.executemany(
+                "INSERT INTO source_names VALUES (?, ?, ?)",
+                [(source_id, mode, name) for mode, mode_names in names.items() for name in mode_names],
+            )
+            conn.row_factory = sqlite3.Row
+            source = dict(conn.execute("SELECT * FROM sources WHERE id = ?", (source_id,)).fetchone())
+        return ("replaced" if previous else "loaded"), source
+
+    def remove_source(self, source_id):
+        with self._connect() as conn:
+            return self._remove_source(conn, source_id)
+
+    def _remove_source(self, conn, source_id):
+        row = conn.execute("SELECT country FROM sources WHERE id = ?", (source_id,)).fetchone()
+        if row is None:
+            return False
+        conn.execute(
+            "UPDATE aggregates SET total = total - ("
+            " SELECT c.total FROM contributions c WHERE c.source_id = ? AND c.mode = aggregates.mode"
+            " AND c.metric = aggregates.metric AND c.name = aggregates.name AND c.period = aggregates.period"
+            ") WHERE country = ? AND EXISTS ("
+            " SELECT 1 FROM contributions c WHERE c.source_id = ? AND c.mode = aggregates.mode"
+            " AND c.metric = aggregates.metric AND c.name = aggregates.name AND c.period = aggregates.period)",
+            (source_id, row[0], source_id),
+        )
+        conn.execute("DELETE FROM aggregates WHERE country = ? AND total = 0", (row[0],))
+        conn.execute("DELETE FROM contributions WHERE source_id = ?", (source_id,))
+        conn.execute("DELETE FROM source_names WHERE source_id = ?", (source_id,))
+        conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+        return True
+
+    def cube(self, country, mode, metric, years=None, aliases=None):
+        # Rebuild the (name x year-month) cube summarize_cube would give for the stored sources
+        country = country.upper()
+        period_filter, name_filter, params = "", "", []
+        if years:
+            years = sorted(set(years))
+            period_filter = " AND (" + " OR ".join(["period BETWEEN ? AND ?"] * len(years)) + ")"
+            name_filter = " AND s.year IN (" + ",".join("?" * len(years)) + ")"
+            params = [p for y in years for p in (y * 12, y * 12 + 11)]
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, period, total FROM aggregates WHERE country = ? AND mode = ? AND metric = ?" + period_filter,
+                [country, mode, metric, *params],
+            ).fetchall()
+            names = [r[0] for r in conn.execute(
+                "SELECT DISTINCT n.name FROM source_names n JOIN sources s ON s.id = n.source_id "
+                "WHERE s.country = ? AND n.mode = ?" + name_filter,
+                [country, mode, *(years or [])],
+            )]
+
+        frame = pd.DataFrame(rows, columns=["name", "period", "total"])
+        all_names = pd.Series(sorted(set(names) | set(frame["name"])), dtype=object)
+        frame["name"] = apply_aliases(frame["name"].replace(MISSING_NAME, np.nan), aliases)
+        all_names = apply_aliases(all_names.replace(MISSING_NAME, np.nan), aliases)
+
+        index = pd.Index(all_names.unique()).sort_values()
+        periods = sorted(frame["period"].unique().tolist())
+        totals = (
+            frame.groupby(["name", "period"], dropna=False)["total"].sum()
+            .unstack("period", fill_value=0)
+            .reindex(index=index, columns=periods, fill_value=0)
+        )
+        return build_cube_frame(index, totals.to_numpy(dtype="int64"), periods)
+
+    def summarize(self, country, mode, types=tuple(VALUE_COLUMNS), years=None, aliases=None, layout="combined"):
+        return {t: month_layout(self.cube(country, mode, t, years, aliases), layout) for t in types}
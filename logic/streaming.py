@@ -0,0 +1,42 @@
+from openpyxl import load_workbook
+
+from logic.instrument import traced
+from logic.summarizer import DATE_COL, WEIGHT_COL, QUANTITY_COL, summarize_rows_days
+
+PROGRESS_EVERY = 10000  # rows between progress reports (and cancellation checks)
+
+
+def iter_sheet_rows(path, sheet_name, col_indices):
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        # Row 1 is the sheet header, the same row pd.read_excel consumes as column names
+        for row in ws.iter_rows(min_row=2, max_col=max(col_indices) + 1, values_only=True):
+            values = tuple(row[i] if i < len(row) else None for i in col_indices)
+            if all(v is None for v in values):
+                continue
+            yield values
+    finally:
+        wb.close()
+
+
+def _with_progress(rows, progress, record):
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(f"Streamed {count:,} rows")
+        yield row
+    record["rows"] = count
+
+
+def stream_days(path, sheet_name, name_col_indices, value_col_indices=(WEIGHT_COL, QUANTITY_COL), progress=None, aliases=None, trace=None):
+    # One read of the sheet gives a DayCube for each name column (aliases: one map per column)
+    name_col_indices, value_col_indices = list(name_col_indices), list(value_col_indices)
+    rows = iter_sheet_rows(path, sheet_name, [DATE_COL, *name_col_indices, *value_col_indices])
+    # Reading and aggregating are interleaved here, so they are one stage
+    with traced(trace, "stream + aggregate") as record:
+        days = summarize_rows_days(_with_progress(rows, progress, record), len(name_col_indices), value_col_indices, aliases)
+        # Every name column sees the same date cells, as in the frame path
+        record["unparseable"] = max((d.attrs["unparseable_dates"] for d in days), default=0)
+    return days
+
@@ -1,62 +1,533 @@
+import datetime
+
 import pandas as pd
 import numpy as np
 
-class Entry:
-    def __init__(self, name, month, quantity, weight):
-        self.name = name
-        self.month = month
-        self.quantity = quantity
-        self.weight = weight
-
-def read_and_summarize(df, name_col_index, value_col_index=24):
-    entries = []
-
-    for idx, row in df.iterrows():
-        name = row.iloc[name_col_index]
-
-        # Skip rows where name is 'Exporter' or 'Importer' (case-insensitive)
-        if isinstance(name, str) and name.strip().lower() in ('exporter', 'importer'):
-            continue
-
-        date_raw = row.iloc[1]  # B
-        value = row.iloc[value_col_index]
-
-        try:
-            month = pd.to_datetime(date_raw).to_period('M').strftime('%Y-%m')
-        except Exception:
-            month = 'Unknown'
-
-        value = pd.to_numeric(value, errors='coerce')
-        value = 0 if pd.isna(value) else value
-
-        entries.append(Entry(name, month, 0, value))  # quantity unused here for simplicity
-
-    summary = {}
-    for e in entries:
-        if e.name not in summary:
-            summary[e.name] = {}
-        if e.month not in summary[e.name]:
-            summary[e.name][e.month] = {"total_value": 0}
-        summary[e.name][e.month]["total_value"] += e.weight  # using weight to store the value
-
-    names = sorted(summary.keys())
-    months = [f"{m:02d}" for m in range(1, 13)]
-
-    data = []
-    for name in names:
-        row = {"Name": name}
-        for m in months:
-            total = sum(
-                totals["total_value"]
-                for ym, totals in summary[name].items()
-                if ym.endswith(f"-{m}")
-            )
-            row[m] = total
-        data.append(row)
-
-    df_result = pd.DataFrame(data).set_index("Name")
-
-    # Round up to 3 decimal places
-    df_result = np.ceil(df_result * 100) / 100
-
-    return df_result
\ No newline at end of file
+from logic.instrument import traced
+from logic.options import parse_tail
+
+DATE_COL = 1        # B
+EXPORTER_COL = 4    # E
+IMPORTER_COL = 8    # I
+QUANTITY_COL = 23   # W
+WEIGHT_COL = 24     # Y
+
+NAME_COLUMNS = {"Importer": IMPORTER_COL, "Exporter": EXPORTER_COL}
+VALUE_COLUMNS = {"Weight": WEIGHT_COL, "Quantity": QUANTITY_COL}
+USED_COLUMNS = (DATE_COL, EXPORTER_COL, IMPORTER_COL, QUANTITY_COL, WEIGHT_COL)
+
+MONTHS = [f"{m:02d}" for m in range(1, 13)]
+
+# Period grains a day-level cube can be rolled up to, with the labels of their positions
+# within a year ("combined" layout columns); days use a leap year's calendar
+PERIOD_NAMES = {"month": "Month", "quarter": "Quarter", "week": "Week", "day": "Day"}
+PERIODS_PER_YEAR = {"month": 12, "quarter": 4, "week": 52, "day": 365}
+PERIOD_SLOT_LABELS = {
+    "month": MONTHS,
+    "quarter": [f"Q{q}" for q in range(1, 5)],
+    "week": [f"W{w:02d}" for w in range(1, 54)],
+    "day": pd.date_range("2000-01-01", "2000-12-31").strftime("%m-%d").tolist(),
+}
+LEAP_YEAR_MONTH_STARTS = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+HEADER_NAMES = ("exporter", "importer")
+
+# Date cells arrive as datetimes, Excel serial numbers or text. Text is tried against these
+# unambiguous formats first; anything else falls back to pandas' mixed-format parser
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%Y%m%d",
+)
+# Placeholder text in an empty date cell is a missing date, not an unparseable one
+MISSING_DATE_TEXT = {"", "-", "N/A", "NA", "#N/A", "NULL", "NONE", "NAN", "NAT"}
+# Frames whose date column is already parsed (sidecar files) keep the text of the
+# cells that failed in this column, so they are still counted as unparseable
+DATE_ERROR_COLUMN = "date_error"
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+UNIX_EPOCH = pd.Timestamp("1970-01-01")  # day-level cubes count days from here
+EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+# Summaries are held as exact int64 fixed-point units (millionths); sums and combines
+# never round, and the round-up-to-hundredths policy is applied once by round_summary()
+FIXED_POINT_SCALE = 1_000_000
+
+
+def source_column(df, col_index):
+    # Frames loaded with only the used columns record where each one sat in the sheet
+    source_columns = df.attrs.get("source_columns")
+    if source_columns is not None:
+        return df.iloc[:, list(source_columns).index(col_index)]
+    return df.iloc[:, col_index]
+
+
+def header_row_mask(names):
+    # Repeated header rows carry 'Exporter' / 'Importer' (case-insensitive) in the name column
+    try:
+        lowered = names.str.strip().str.lower()
+    except AttributeError:
+        return pd.Series(False, index=names.index)
+    return lowered.isin(HEADER_NAMES).fillna(False).astype(bool)
+
+
+def blank_row_mask(df, name_col_index, value_col_indices):
+    # Rows with nothing in the date, name and value columns; the streaming reader never
+    # sees them, so they are dropped here too instead of becoming a blank-name row
+    blank = source_column(df, DATE_COL).isna() & source_column(df, name_col_index).isna()
+    if DATE_ERROR_COLUMN in df.columns:
+        blank &= df[DATE_ERROR_COLUMN].isna()
+    for col in value_col_indices:
+        blank &= source_column(df, col).isna()
+    return blank
+
+
+def name_text(value):
+    # Names are text on every read path: a numeric cell (an importer code 12345, which
+    # pandas may hold as 12345.0) becomes "12345"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def text_names(names):
+    # Vectorized name_text over the distinct names; missing names stay missing
+    codes, uniques = pd.factorize(names)
+    if all(isinstance(u, str) for u in uniques):
+        return names
+    text = pd.Index([u if isinstance(u, str) else name_text(u) for u in uniques], dtype=object)
+    return pd.Series(text.take(codes, allow_fill=True, fill_value=np.nan), index=names.index, name=names.name, dtype=object)
+
+
+def to_fixed_point(values):
+    return np.rint(np.asarray(values, dtype="float64") * FIXED_POINT_SCALE).astype("int64")
+
+
+def round_summary(df):
+    # Round up to 2 decimal places using exact integer arithmetic
+    step = FIXED_POINT_SCALE // 100
+    return -(-df // step) / 100
+
+
+def build_summary_frame(names, totals, columns=MONTHS):
+    return pd.DataFrame(
+        np.asarray(totals, dtype="int64"), index=pd.Index(names, name="Name"), columns=columns
+    )
+
+
+def build_cube_frame(names, totals, periods):
+    # Cube columns are integer periods of one grain, e.g. months counted as year * 12 + (month - 1)
+    return pd.DataFrame(
+        np.asarray(totals, dtype="int64").reshape(len(names), len(periods)),
+        index=pd.Index(names, name="Name"),
+        columns=pd.Index(periods, dtype="int64", name="Period"),
+    )
+
+
+def period_keys(days, grain="month"):
+    # Consecutive integer periods for days counted from 1970-01-01: months and quarters count
+    # from year 0 (year * 12 + month - 1), weeks are Monday-based (ISO) and days stay as they are
+    days = np.asarray(days, dtype="int64")
+    if grain == "day":
+        return days
+    if grain == "week":
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype("int64") + 1970 * 12
+    return months // 3 if grain == "quarter" else months
+
+
+def period_year_slot(periods, grain="month"):
+    # Year of each period and its position within that year (ISO year and week for weeks,
+    # position in a leap year's calendar for days)
+    periods = np.asarray(periods, dtype="int64")
+    per_year = {"month": 12, "quarter": 4}.get(grain)
+    if per_year:
+        return periods // per_year, periods % per_year
+    if grain == "week":
+        iso = pd.DatetimeIndex((periods * 7 - 3).astype("datetime64[D]")).isocalendar()
+        return iso["year"].to_numpy(dtype="int64"), iso["week"].to_numpy(dtype="int64") - 1
+    dates = periods.astype("datetime64[D]")
+    months = dates.astype("datetime64[M]")
+    day_of_month = (dates - months.astype("datetime64[D]")).astype("int64")
+    years = dates.astype("datetime64[Y]").astype("int64") + 1970
+    return years, LEAP_YEAR_MONTH_STARTS[months.astype("int64") % 12] + day_of_month
+
+
+def period_labels(periods, grain="month"):
+    years, slots = period_year_slot(periods, grain)
+    labels = PERIOD_SLOT_LABELS[grain]
+    return [f"{y}-{labels[s]}" for y, s in zip(years.tolist(), slots.tolist())]
+
+
+def period_layout(cube, layout="combined", grain="month"):
+    # Lay a cube of one grain out as summary columns; each cube column is added into its
+    # summary column with a single scatter-add
+    periods = cube.columns.to_numpy(dtype="int64")
+    labels = PERIOD_SLOT_LABELS[grain]
+
+    if layout == "per_year" and len(periods):
+        years, slots = period_year_slot(periods, grain)
+        year_list = sorted(set(years.tolist()))
+        targets = np.searchsorted(year_list, years) * len(labels) + slots
+        columns = pd.MultiIndex.from_tuples(
+            [(str(y), label) for y in year_list for label in labels], names=["Year", PERIOD_NAMES[grain]]
+        )
+
+    elif layout.startswith("rolling_") and len(periods):
+        months = int(layout.split("_")[1])
+        count = max(1, months * PERIODS_PER_YEAR[grain] // 12)
+        start = int(periods.max()) - count + 1
+        full = np.arange(start, start + count)
+        targets = periods - start
+        columns = period_labels(full, grain)
+
+    else:
+        # Same slot of every year (calendar month, quarter, ISO week or day) summed together
+        _, targets = period_year_slot(periods, grain)
+        columns = labels
+
+    totals = np.zeros((len(cube), len(columns)), dtype="int64")
+    inside = targets >= 0  # periods before a rolling window are left out
+    np.add.at(totals.T, targets[inside], cube.to_numpy(dtype="int64").T[inside])
+    summary = build_summary_frame(cube.index, totals, columns)
+    if grain != "month" and not isinstance(summary.columns, pd.MultiIndex):
+        summary.columns.name = f"{PERIOD_NAMES[grain]}s"  # header band over the period columns
+
+    # Data-quality counts (e.g. rows with unparseable dates) travel with the summary
+    summary.attrs.update(cube.attrs)
+    return summary
+
+
+def month_layout(cube, layout="combined"):
+    return period_layout(cube, layout, "month")
+
+
+def largest_rows(totals, tail):
+    # Positions of the rows a tail option keeps. argpartition selects the largest totals
+    # without sorting every row; only the kept rows are ever sorted.
+    kind, amount = parse_tail(tail)
+    n = len(totals)
+    if kind == "top":
+        if amount >= n:
+            return np.arange(n)
+        return np.argpartition(totals, n - amount)[n - amount:]
+
+    # Fewest rows reaching the share: widen the partition until its sum gets there, then
+    # sort just that partition to find the exact cut-off
+    target = totals.sum() * amount / 100
+    count = min(n, 256)
+    top = np.argpartition(totals, n - count)[n - count:]
+    while count < n and totals[top].sum() < target:
+        count = min(n, count * 4)
+        top = np.argpartition(totals, n - count)[n - count:]
+    ordered = top[np.argsort(-totals[top])]
+    reached = np.cumsum(totals[ordered]) >= target
+    return ordered[:int(reached.argmax()) + 1] if reached.any() else ordered
+
+
+def others_label(count):
+    return f"Others ({count:,} names)"
+
+
+def compact_tail(summary, tail):
+    # Keep the rows selected by the tail option (in their original order) and sum the rest
+    # into a last "Others" row. Returns the compacted summary and the folded rows, or the
+    # summary and None when nothing is folded.
+    if parse_tail(tail) is None or summary.empty:
+        return summary, None
+    values = summary.to_numpy(dtype="int64")
+    keep = np.zeros(len(summary), dtype=bool)
+    keep[largest_rows(values.sum(axis=1), tail)] = True
+    if keep.all():
+        return summary, None
+
+    folded = summary[~keep]
+    others = others_label(len(folded))
+    compacted = pd.concat([
+        summary[keep],
+        pd.DataFrame(values[~keep].sum(axis=0, keepdims=True), index=pd.Index([others], name=summary.index.name), columns=summary.columns),
+    ])
+    compacted.attrs.update(summary.attrs)
+    compacted.attrs["others"] = others
+    return compacted, folded
+
+
+def apply_aliases(names, aliases):
+    # Vectorized variant -> canonical lookup; names without an alias are kept as they are
+    if not aliases:
+        return names
+    mapped = names.map(aliases)
+    return names.where(mapped.isna(), mapped)
+
+
+def excel_serial_dates(serials):
+    serials = pd.to_numeric(serials, errors="coerce").astype("float64")
+    serials = serials.where((serials >= 1) & (serials <= EXCEL_MAX_SERIAL))
+    return EXCEL_EPOCH + pd.to_timedelta(serials, unit="D")
+
+
+def _parse_text_dates(text):
+    text = text.str.strip()
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+
+    # Plain numbers typed as text ("45123") are Excel serials when they have five digits
+    # (1927-2173) and yyyymmdd when they have eight. Any other number, such as a bare year,
+    # is not a date and is counted as unparseable
+    number = text.str.fullmatch(r"\d+(\.\d+)?")
+    serial = text.str.fullmatch(r"\d{5}(\.\d+)?")
+    parsed[serial] = excel_serial_dates(text[serial])
+    yyyymmdd = text.str.fullmatch(r"\d{8}")
+    parsed[yyyymmdd] = pd.to_datetime(text[yyyymmdd], format="%Y%m%d", errors="coerce")
+
+    remaining = ~number
+    for fmt in DATE_FORMATS:
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(text[remaining], format=fmt, errors="coerce")
+        hit = attempt.notna()
+        parsed[hit[hit].index] = attempt[hit]
+        remaining[hit[hit].index] = False
+    if remaining.any():
+        parsed[remaining] = pd.to_datetime(text[remaining], format="mixed", errors="coerce")
+    return parsed
+
+
+def _parse_unique_dates(values):
+    # values: distinct raw cells (object Series); each is parsed according to its type
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    is_date = values.map(lambda v: isinstance(v, (datetime.date, np.datetime64)))
+    is_number = values.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)))
+    is_text = values.map(lambda v: isinstance(v, str))
+
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(values[is_date], errors="coerce")
+    if is_number.any():
+        parsed[is_number] = excel_serial_dates(values[is_number])
+    if is_text.any():
+        parsed[is_text] = _parse_text_dates(values[is_text].astype(str))
+    return parsed
+
+
+def parse_dates(values):
+    # Whole-column date parsing: a year of data has only a few hundred distinct date
+    # cells, so each distinct value is parsed once and the result is spread back to the
+    # rows. Unparseable cells become NaT and are left out of every month.
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = _parse_unique_dates(pd.Series(uniques, dtype=object)).to_numpy()
+    dates = np.where(codes >= 0, parsed[np.maximum(codes, 0)], np.datetime64("NaT"))
+    return pd.Series(dates, index=values.index, name=values.name, dtype="datetime64[ns]")
+
+
+def parse_date(value):
+    # Single-cell variant for row-at-a-time readers, with the same rules as parse_dates
+    if value is None:
+        return pd.NaT
+    return _parse_unique_dates(pd.Series([value], dtype=object)).iloc[0]
+
+
+def _is_missing_date(value):
+    if isinstance(value, str):
+        return value.strip().upper() in MISSING_DATE_TEXT
+    return value is None or (not isinstance(value, datetime.date) and pd.isna(value))
+
+
+def count_unparseable_dates(raw, dates):
+    # Rows whose date cell is filled in but could not be read as a date
+    failed = raw[(dates.isna() & raw.notna()).to_numpy()]
+    return int((~failed.map(_is_missing_date).astype(bool)).sum())
+
+
+class DayCube:
+    # Totals per (name, day) as parallel arrays of the non-empty cells, built once per sheet.
+    # Month, quarter, ISO-week and day cubes are rolled up from it with one scatter-add each.
+    def __init__(self, names, codes, days, totals, attrs=None):
+        self.names = names    # sorted Index; names whose dates all failed to parse included
+        self.codes = codes    # row of each cell in names
+        self.days = days      # days since 1970-01-01
+        self.totals = totals  # value column -> int64 fixed-point total of each cell
+        self.attrs = dict(attrs or {})
+        self._periods = {}
+
+    def periods(self, grain):
+        # Distinct periods of the grain and the period of each cell, computed once per grain
+        if grain not in self._periods:
+            self._periods[grain] = np.unique(period_keys(self.days, grain), return_inverse=True)
+        return self._periods[grain]
+
+    def cube(self, col, grain="month", aliases=None):
+        periods, cell_periods = self.periods(grain)
+        names, codes = self.names, self.codes
+        if aliases:
+            mapped = apply_aliases(names, aliases)
+            names = pd.Index(mapped.unique()).sort_values()
+            codes = names.get_indexer(mapped)[codes]
+        totals = np.zeros((len(names), len(periods)), dtype="int64")
+        np.add.at(totals, (codes, cell_periods), self.totals[col])
+        cube = build_cube_frame(names, totals, periods)
+        cube.attrs.update(self.attrs)
+        return cube
+
+    def cubes(self, grain="month", aliases=None):
+        return {col: self.cube(col, grain, aliases) for col in self.totals}
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.days.nbytes + sum(t.nbytes for t in self.totals.values())
+
+
+def day_numbers(dates):
+    # Days since 1970-01-01, NaN where the date is missing
+    return (dates - UNIX_EPOCH).dt.days
+
+
+def summarize_days(df, name_col_index, value_col_indices=(WEIGHT_COL, QUANTITY_COL), aliases=None, trace=None):
+    # One groupby over (name, day); every grain and layout is derived from the result
+    value_col_indices = list(value_col_indices)
+
+    with traced(trace, "clean", len(df)):
+        names = text_names(source_column(df, name_col_index))
+        keep = ~(header_row_mask(names) | blank_row_mask(df, name_col_index, value_col_indices)).to_numpy()
+        names = apply_aliases(names, aliases)
+
+        frame = pd.DataFrame({"name": names.to_numpy()[keep]})
+        for col in value_col_indices:
+            values = pd.to_numeric(source_column(df, col), errors="coerce").fillna(0)
+            frame[col] = to_fixed_point(values.to_numpy(dtype="float64"))[keep]
+    with traced(trace, "parse dates", len(df)) as record:
+        raw_dates = source_column(df, DATE_COL)
+        dates = parse_dates(raw_dates)
+        if DATE_ERROR_COLUMN in df.columns:
+            raw_dates = df[DATE_ERROR_COLUMN]
+        frame["day"] = day_numbers(dates).to_numpy()[keep]
+        unparseable = count_unparseable_dates(raw_dates[keep], dates[keep])
+        record["unparseable"] = unparseable
+
+    with traced(trace, "aggregate", len(frame)):
+        # Names are grouped as integer codes in sorted-name order; names whose rows all have
+        # unparseable dates keep a code, so they still get an all-zero row
+        name_codes, uniques = pd.factorize(frame["name"], use_na_sentinel=False)
+        all_names, order = pd.Index(uniques).sort_values(return_indexer=True)
+        rank = np.empty(len(order), dtype="int64")
+        rank[order] = np.arange(len(order))
+        frame["code"] = rank[name_codes]
+
+        dated = frame[frame["day"].notna()]
+        sums = dated.groupby(["code", dated["day"].astype("int64")], sort=False)[value_col_indices].sum()
+        return DayCube(
+            all_names,
+            sums.index.get_level_values(0).to_numpy(dtype="int64"),
+            sums.index.get_level_values(1).to_numpy(dtype="int64"),
+            {col: sums[col].to_numpy(dtype="int64") for col in value_col_indices},
+            {"unparseable_dates": unparseable},
+        )
+
+
+def summarize_cube(df, name_col_index, value_col_indices=(WEIGHT_COL, QUANTITY_COL), aliases=None, trace=None, grain="month"):
+    return summarize_days(df, name_col_index, value_col_indices, aliases, trace).cubes(grain)
+
+
+def summarize_metrics(df, name_col_index, value_col_indices=(WEIGHT_COL, QUANTITY_COL), aliases=None, layout="combined", trace=None, grain="month"):
+    days = summarize_days(df, name_col_index, value_col_indices, aliases, trace)
+    with traced(trace, "layout"):
+        return {col: period_layout(cube, layout, grain) for col, cube in days.cubes(grain).items()}
+
+
+def _day_of(date_raw):
+    date = parse_date(date_raw)
+    return None if pd.isna(date) else (date - UNIX_EPOCH).days
+
+
+def _fixed_point_of(value):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        value = pd.to_numeric(value, errors="coerce")
+    return 0 if pd.isna(value) else round(float(value) * FIXED_POINT_SCALE)
+
+
+def summarize_rows_days(rows, name_count, value_col_indices=(WEIGHT_COL, QUANTITY_COL), aliases=None):
+    # rows yield (date, name..., value...) tuples with name_count name cells; one pass builds a
+    # DayCube per name column. Memory grows with distinct names x days, not rows
+    value_col_indices = list(value_col_indices)
+    aliases = list(aliases or [None] * name_count)
+
+    day_cache = {}
+    unparseable = [0] * name_count
+    accumulators = [{} for _ in range(name_count)]  # per name column: name -> {day: [value totals]}
+    for row in rows:
+        date_raw, values = row[0], row[name_count + 1:]
+        # A row with nothing but a name cell of another column is blank for this one
+        blank = date_raw is None and all(v is None for v in values)
+        day = fixed = None
+        parsed = False
+        for i, name in enumerate(row[1:name_count + 1]):
+            if isinstance(name, str) and name.strip().lower() in HEADER_NAMES:
+                continue
+            if name is None:
+                if blank:
+                    continue
+                name = np.nan
+            else:
+                if not isinstance(name, str):
+                    name = name_text(name)
+                if aliases[i]:
+                    name = aliases[i].get(name, name)
+
+            acc = accumulators[i].get(name)
+            if acc is None:
+                acc = accumulators[i][name] = {}
+
+            if not parsed:
+                parsed = True
+                try:
+                    day = day_cache[date_raw]
+                except KeyError:
+                    day = day_cache[date_raw] = _day_of(date_raw)
+                except TypeError:  # unhashable cell value
+                    day = _day_of(date_raw)
+                if day is not None:
+                    fixed = [_fixed_point_of(value) for value in values]
+            if day is None:
+                if not _is_missing_date(date_raw):
+                    unparseable[i] += 1
+                continue
+
+            totals = acc.get(day)
+            if totals is None:
+                acc[day] = list(fixed)
+            else:
+                for j, value in enumerate(fixed):
+                    totals[j] += value
+
+    return [
+        _accumulated_day_cube(acc, value_col_indices, count)
+        for acc, count in zip(accumulators, unparseable)
+    ]
+
+
+def _accumulated_day_cube(accumulators, value_col_indices, unparseable):
+    n_values = len(value_col_indices)
+    all_names = pd.Index(list(accumulators)).sort_values()
+    codes, days, totals = [], [], []
+    for row, name in enumerate(all_names):
+        for day, day_totals in accumulators[name].items():
+            codes.append(row)
+            days.append(day)
+            totals.append(day_totals)
+    totals = np.array(totals, dtype="int64").reshape(len(totals), n_values)
+
+    return DayCube(
+        all_names,
+        np.array(codes, dtype="int64"),
+        np.array(days, dtype="int64"),
+        {col: totals[:, i].copy() for i, col in enumerate(value_col_indices)},
+        {"unparseable_dates": unparseable},
+    )
+
+
+def read_and_summarize(df, name_col_index, value_col_index=WEIGHT_COL):
+    return round_summary(summarize_metrics(df, name_col_index, [value_col_index])[value_col_index])
@@ -0,0 +1,67 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+class NameTable:
+    # Every distinct name held once; summaries refer to names by their integer code
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, names):
+        codes = np.empty(len(names), dtype="int32")
+        for i, name in enumerate(names):
+            if name != name:  # every missing (NaN) name shares one entry
+                name = np.nan
+            code = self.codes.get(name)
+            if code is None:
+                code = self.codes[name] = len(self.names)
+                self.names.append(name)
+            codes[i] = code
+        return codes
+
+    def lookup(self, codes):
+        return [self.names[code] for code in codes.tolist()]
+
+    @property
+    def nbytes(self):
+        # The strings themselves plus the list and lookup dict that hold them
+        return sum(sys.getsizeof(name) for name in self.names) + sys.getsizeof(self.names) + sys.getsizeof(self.codes)
+
+
+class Summary:
+    # A summary frame kept as name codes into a shared NameTable and one dense int64
+    # (names x columns) array; frames are rebuilt only for previews and export
+    def __init__(self, table, codes, values, columns, index_name="Name", attrs=None):
+        self.table = table
+        self.codes = codes
+        self.values = values
+        self.columns = columns
+        self.index_name = index_name
+        self.attrs = dict(attrs or {})
+        self.folded = None  # rows folded into "Others" by a tail option, as another Summary
+
+    @classmethod
+    def from_frame(cls, df, table):
+        return cls(table, table.intern(df.index), df.to_numpy(dtype="int64"), df.columns, df.index.name, df.attrs)
+
+    def to_frame(self):
+        df = pd.DataFrame(
+            self.values, index=pd.Index(self.table.lookup(self.codes), name=self.index_name), columns=self.columns
+        )
+        df.attrs.update(self.attrs)
+        return df
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        # Excludes the shared name table, which is counted once for all summaries
+        folded = self.folded.nbytes if self.folded is not None else 0
+        return self.codes.nbytes + self.values.nbytes + folded
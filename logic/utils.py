@@ -1,92 +1,105 @@
-import os
-import re
-from openpyxl import load_workbook
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Alignment
+from openpyxl.worksheet.cell_range import CellRange
 
-def extract_sheet_name_from_filename(filename):
-    base = os.path.splitext(os.path.basename(filename))[0]
-    match = re.match(r"([A-Za-z]+)(\d{4})", base)
-    if match:
-        return f"{match.group(1)}_{match.group(2)}"
-    return None
-
-def generate_suggested_output_filename(filename, selected_modes):
-    base = os.path.splitext(os.path.basename(filename))[0]
-    match = re.match(r"([A-Za-z]+\d{4})", base)
-    if match:
-        base = match.group(1)
-
-    suffix_parts = []
-    if "Importer" in selected_modes:
-        suffix_parts.append("im")
-    if "Exporter" in selected_modes:
-        suffix_parts.append("ex")
-
-    suffix = "_" + "_".join(suffix_parts) + "_per_month"
-    return base + suffix + ".xlsx"
-
-def format_sheet(file_path, sheet_name, mode, unit):
+NUMBER_FORMAT = '#,##0.00'
 
+def format_sheet(file_path, sheet_name, mode, unit, year_blocks=False):
+    # Re-lay out a plain DataFrame.to_excel sheet (Name index + month columns) in place;
+    # with year_blocks, "YYYY-MM" columns are grouped under one header band per year
     wb = load_workbook(file_path)
     ws = wb[sheet_name]
 
-    yellow_fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")
-    blue_fill = PatternFill(start_color="D9E1F5", end_color="D9E1F5", fill_type="solid")
-
-    ws.insert_cols(2)
-    ws.insert_rows(1)
-
-    ws.cell(row=1, column=1, value=f"Unit {unit.lower()}").fill = yellow_fill
-    ws.cell(row=1, column=1).alignment = Alignment(horizontal="center", vertical="center")
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows)
+    data = [row for row in rows if any(v is not None for v in row)]
+    df = pd.DataFrame([row[1:] for row in data], index=[row[0] for row in data], columns=list(header[1:]))
+    if year_blocks:
+        df.columns = pd.MultiIndex.from_tuples([str(c).split("-", 1) for c in df.columns], names=["Year", "Month"])
 
-    ws.merge_cells(start_row=1, start_column=2, end_row=1, end_column=14)
-    ws.cell(row=1, column=2, value="Months").fill = blue_fill
-    ws.cell(row=1, column=2).alignment = Alignment(horizontal="center", vertical="center")
+    position = wb.sheetnames.index(sheet_name)
+    wb.remove(ws)
+    write_summary_sheet(wb.create_sheet(sheet_name, position), df, mode, unit)
 
-    ws.cell(row=2, column=1, value=mode).fill = blue_fill
-    ws.cell(row=2, column=1).alignment = Alignment(horizontal="center", vertical="center")
+    wb.save(file_path)
 
-    ws.cell(row=2, column=2, value="Total").fill = blue_fill
-    ws.cell(row=2, column=2).alignment = Alignment(horizontal="center", vertical="center")
 
-    for i, month in enumerate([f"{m:02d}" for m in range(1, 13)], start=3):
-        ws.cell(row=2, column=i, value=month).fill = blue_fill
-        ws.cell(row=2, column=i).alignment = Alignment(horizontal="center", vertical="center")
+def summary_totals(df):
+    values = np.nan_to_num(df.to_numpy(dtype="float64"))
+    row_totals = np.round(values.sum(axis=1), 2)
+    col_totals = np.round(values.sum(axis=0), 2)
+    grand_total = round(float(row_totals.sum()), 2)
+    return values, row_totals, col_totals, grand_total
 
-    # Fill row totals and apply number formatting
-    for row in range(3, ws.max_row + 1):
-        total = sum(ws.cell(row=row, column=col).value or 0 for col in range(3, 15))
-        total_cell = ws.cell(row=row, column=2, value=round(total, 2))
-        total_cell.number_format = '#,##0.00'
 
-        for col in range(3, 15):
-            cell = ws.cell(row=row, column=col)
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = '#,##0.00'
-
-    total_row = ws.max_row + 1
-    ws.cell(row=total_row, column=1, value="Total").fill = blue_fill
-    ws.cell(row=total_row, column=1).alignment = Alignment(horizontal="center", vertical="center")
-
-    total_sum = 0
-    for row in range(3, total_row):
-        val = ws.cell(row=row, column=2).value
-        total_sum += val if isinstance(val, (int, float)) else 0
-
-    ws.cell(row=total_row, column=2, value=round(total_sum, 2)).fill = blue_fill
-    ws.cell(row=total_row, column=2).alignment = Alignment(horizontal="center", vertical="center")
-    ws.cell(row=total_row, column=2).number_format = '#,##0.00'
+def _cell(ws, value, fill=None, number_format=None, center=False):
+    cell = WriteOnlyCell(ws, value=value)
+    if fill is not None:
+        cell.fill = fill
+    if number_format is not None:
+        cell.number_format = number_format
+    if center:
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+    return cell
 
-    # Add column totals (C to N)
-    for col in range(3, 15):
-        col_total = 0
-        for row in range(3, total_row):
-            val = ws.cell(row=row, column=col).value
-            col_total += val if isinstance(val, (int, float)) else 0
 
-        cell = ws.cell(row=total_row, column=col, value=round(col_total, 2))
-        cell.fill = blue_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.number_format = '#,##0.00'
+def write_summary_sheet(ws, df, mode, unit):
+    yellow_fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")
+    blue_fill = PatternFill(start_color="D9E1F5", end_color="D9E1F5", fill_type="solid")
 
-    wb.save(file_path)
\ No newline at end of file
+    # Header bands: "Months" over Total + all columns, or one band per year for (year, month) columns
+    if isinstance(df.columns, pd.MultiIndex):
+        columns = [str(c[-1]) for c in df.columns]
+        bands = []
+        for i, group in enumerate(str(c[0]) for c in df.columns):
+            if bands and bands[-1][0] == group:
+                bands[-1][2] = i + 3
+            else:
+                bands.append([group, i + 3, i + 3])
+        bands.insert(0, ["", 2, 2])
+    else:
+        columns = [str(c) for c in df.columns]
+        bands = [[df.columns.name or "Months", 2, 2 + len(columns)]]
+
+    values, row_totals, col_totals, grand_total = summary_totals(df)
+
+    band_row = [None] * (2 + len(columns))
+    band_row[0] = _cell(ws, f"Unit {unit.lower()}", fill=yellow_fill, center=True)
+    for label, start, _ in bands:
+        band_row[start - 1] = _cell(ws, label, fill=blue_fill, center=True)
+    ws.append(band_row)
+    ws.append([_cell(ws, title, fill=blue_fill, center=True) for title in [mode, "Total", *columns]])
+
+    for name, total, row in zip(df.index, row_totals.tolist(), values.tolist()):
+        ws.append(
+            [_cell(ws, name), _cell(ws, total, number_format=NUMBER_FORMAT)]
+            + [_cell(ws, v, number_format=NUMBER_FORMAT) for v in row]
+        )
+
+    ws.append(
+        [_cell(ws, "Total", fill=blue_fill, center=True)]
+        + [
+            _cell(ws, v, fill=blue_fill, number_format=NUMBER_FORMAT, center=True)
+            for v in [grand_total, *col_totals.tolist()]
+        ]
+    )
+
+    for _, start, end in bands:
+        if end == start:
+            continue
+        band_range = CellRange(min_col=start, min_row=1, max_col=end, max_row=1)
+        if hasattr(ws, "merge_cells"):
+            ws.merge_cells(band_range.coord)
+        else:  # write-only worksheets only record the range
+            ws.merged_cells.add(band_range)
+
+
+def write_summary_workbook(file_path, sheets):
+    # sheets: iterable of (sheet_name, mode, unit, df); the file is written once, already formatted
+    wb = Workbook(write_only=True)
+    for sheet_name, mode, unit, df in sheets:
+        write_summary_sheet(wb.create_sheet(sheet_name), df, mode, unit)
+    wb.save(file_path)
@@ -1,5 +1,41 @@
-from gui.app import App
+import argparse
+import sys
 
-if __name__ == "__main__":
-    app = App()
+from logic.instrument import RunTrace
+
+
+def measure_startup():
+    # Time to first window: importing the GUI, building the widgets and drawing them once.
+    # Background warming is left off so it cannot skew the numbers.
+    trace = RunTrace("startup")
+    with trace.stage("import gui"):
+        from gui.app import App
+    with trace.stage("build window"):
+        app = App(warm_imports=False)
+    with trace.stage("first draw"):
+        app.update()
+    trace.context["heavy_modules_loaded"] = [m for m in ("pandas", "numpy", "openpyxl") if m in sys.modules]
+    trace.finish()
+    app.destroy()
+    trace.write()
+    print(trace.summary())
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly Summary")
+    parser.add_argument("--startup-time", action="store_true", help="Print and log the time until the window is drawn, then exit.")
+    parser.add_argument("--no-warm", action="store_true", help="Do not preload pandas/openpyxl in the background after start-up.")
+    args = parser.parse_args(argv)
+
+    if args.startup_time:
+        return measure_startup()
+
+    from gui.app import App
+    app = App(warm_imports=not args.no_warm)
     app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())